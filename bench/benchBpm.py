@@ -0,0 +1,213 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.leagueBpm import LeagueBpmCalculator
+from src.playerBpm import BpmCalculator
+
+from .syntheticLeague import generate_league
+
+# Usage: python -m bench.benchBpm --team-games 1 100 10000 --output bench.json
+
+DEFAULT_TEAM_GAMES = (1, 100, 10_000)
+
+
+def league_shape(team_games, games_per_team):
+    # (teams, games) covering team_games team-games
+    games = min(games_per_team, team_games)
+    return math.ceil(team_games / games), games
+
+
+def split_league(season_players, season_teams, player_games, team_games):
+    # Per-team and per-team-game inputs in the layout BpmCalculator takes
+    season_dfs = {
+        team: rows.reset_index(drop=True)
+        for team, rows in season_players.groupby("Team", sort=False)
+    }
+    season_metrics = {}
+    season_general = {}
+    for row in season_teams.to_dict("records"):
+        season_metrics[row["Team"]] = {
+            column: row[column] for column in LeagueBpmCalculator.SEASON_METRIC_COLUMNS
+        }
+        season_general[row["Team"]] = {
+            column: row[column] for column in LeagueBpmCalculator.GENERAL_GAME_COLUMNS
+        }
+    game_dfs = {
+        key: rows.reset_index(drop=True)
+        for key, rows in player_games.groupby(["Team", "Game"], sort=False)
+    }
+    game_metrics = {}
+    general_games = {}
+    for row in team_games.to_dict("records"):
+        key = (row["Team"], row["Game"])
+        game_metrics[key] = {
+            column: row[column] for column in LeagueBpmCalculator.GAME_METRIC_COLUMNS
+        }
+        general_games[key] = {
+            column: row[column] for column in LeagueBpmCalculator.GENERAL_GAME_COLUMNS
+        }
+
+    return (
+        season_dfs,
+        season_metrics,
+        season_general,
+        game_dfs,
+        game_metrics,
+        general_games,
+    )
+
+
+def build_stages(season_players, season_teams, player_games, team_games):
+    # Stage name -> (rows scored, callable)
+    (
+        season_dfs,
+        season_metrics,
+        season_general,
+        game_dfs,
+        game_metrics,
+        general_games,
+    ) = split_league(season_players, season_teams, player_games, team_games)
+    calculators = {
+        (team, game): BpmCalculator(
+            season_dfs[team], game_df, season_metrics[team], game_metrics[(team, game)]
+        )
+        for (team, game), game_df in game_dfs.items()
+    }
+    # Season level scoring needs one calculator per team
+    season_calculators = {}
+    for (team, _), calculator in calculators.items():
+        season_calculators.setdefault(team, calculator)
+    league = LeagueBpmCalculator(season_players, season_teams)
+
+    def init():
+        for (team, game), game_df in game_dfs.items():
+            BpmCalculator(
+                season_dfs[team],
+                game_df,
+                season_metrics[team],
+                game_metrics[(team, game)],
+            )
+
+    def calculate_bpm_game():
+        for key, calculator in calculators.items():
+            calculator.calculate_bpm(general_games[key])
+
+    def calculate_bpm_season():
+        for team, calculator in season_calculators.items():
+            calculator.calculate_bpm(season_general[team], aggregation_level="season")
+
+    def calculate_all_stats():
+        for key, calculator in calculators.items():
+            calculator.calculate_all_stats(general_games[key])
+
+    def league_init():
+        LeagueBpmCalculator(season_players, season_teams)
+
+    def league_game_stats():
+        league.calculate_game_stats(player_games, team_games)
+
+    game_rows = len(player_games)
+    season_rows = len(season_players)
+    return {
+        "init": (game_rows, init),
+        "calculate_bpm_game": (game_rows, calculate_bpm_game),
+        "calculate_bpm_season": (season_rows, calculate_bpm_season),
+        "calculate_all_stats": (game_rows, calculate_all_stats),
+        "league_init": (season_rows, league_init),
+        "league_game_stats": (game_rows, league_game_stats),
+    }
+
+
+def time_stage(rows, stage, repeat):
+    # Best of `repeat` untraced runs, then one run under tracemalloc for the
+    # peak memory allocated by the stage
+    seconds = min(measure_seconds(stage) for _ in range(repeat))
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    stage()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def measure_seconds(stage):
+    start = time.perf_counter()
+    stage()
+    return time.perf_counter() - start
+
+
+def run_benchmarks(
+    team_games=DEFAULT_TEAM_GAMES, games_per_team=25, roster_size=13, seed=0, repeat=3
+):
+    results = {}
+    for count in team_games:
+        teams, games = league_shape(count, games_per_team)
+        league_tables = generate_league(teams, games, roster_size, seed)
+        stages = build_stages(*league_tables)
+        results[str(count)] = {
+            "teams": teams,
+            "games": games,
+            "stages": {
+                name: time_stage(rows, stage, repeat)
+                for name, (rows, stage) in stages.items()
+            },
+        }
+
+    return {
+        "config": {
+            "games_per_team": games_per_team,
+            "repeat": repeat,
+            "roster_size": roster_size,
+            "seed": seed,
+        },
+        "environment": {
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BpmCalculator")
+    parser.add_argument(
+        "--team-games", type=int, nargs="+", default=list(DEFAULT_TEAM_GAMES)
+    )
+    parser.add_argument("--games-per-team", type=int, default=25)
+    parser.add_argument("--roster-size", type=int, default=13)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        args.team_games, args.games_per_team, args.roster_size, args.seed, args.repeat
+    )
+    # Sorted keys and fixed indentation keep reports diffable between runs
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from src.playerBpm import coefficient_sets
+
+# Per minute rate ranges a player's tendencies are drawn from
+PLAYER_RATES = {
+    "FGA": (0.15, 0.45),
+    "FTA": (0.04, 0.18),
+    "ORB": (0.01, 0.08),
+    "DRB": (0.05, 0.20),
+    "AST": (0.02, 0.15),
+    "STL": (0.01, 0.05),
+    "BLK": (0.00, 0.05),
+    "TOV": (0.02, 0.08),
+    "PF": (0.03, 0.08),
+}
+
+POSITIONS = ("PG", "SG", "SF", "PF", "C", "G", "F", "G-F")
+
+
+def generate_league(teams=10, games=30, roster_size=13, seed=0):
+    # Seeded synthetic season: returns (season_players, season_teams,
+    # player_games, team_games) long-format DataFrames in the layout used by
+    # LeagueBpmCalculator (keyed by "Team" / "Game")
+    rng = np.random.default_rng(seed)
+    shape = (teams, games, roster_size)
+
+    # Player tendencies, fixed for the season
+    rates = {
+        stat: rng.uniform(low, high, (teams, 1, roster_size))
+        for stat, (low, high) in PLAYER_RATES.items()
+    }
+    three_share = rng.uniform(0.0, 0.6, (teams, 1, roster_size))
+    minute_weights = np.sort(rng.gamma(2.0, 1.0, (teams, 1, roster_size)))[..., ::-1]
+
+    # 200 team minutes per game split by noisy minute weights
+    noisy_weights = minute_weights * rng.uniform(0.6, 1.4, shape)
+    mp = np.round(200 * noisy_weights / noisy_weights.sum(axis=-1, keepdims=True), 1)
+    mp[..., 0] += 200 - mp.sum(axis=-1)
+
+    box = {"MP": mp}
+    for stat in PLAYER_RATES:
+        box[stat] = rng.poisson(mp * rates[stat]).astype(float)
+
+    three_pa = rng.binomial(box["FGA"].astype(int), three_share)
+    box["3P"] = rng.binomial(three_pa, 0.34).astype(float)
+    two_p = rng.binomial((box["FGA"] - three_pa).astype(int), 0.5)
+    ft = rng.binomial(box["FTA"].astype(int), 0.7)
+    box["PTS"] = 2.0 * two_p + 3 * box["3P"] + ft
+    box["TRB"] = box["ORB"] + box["DRB"]
+    box["TSA"] = box["FGA"] + coefficient_sets.get("default").tsa_coef * box["FTA"]
+
+    team_ids = np.array([f"Team {team:04d}" for team in range(teams)])
+    player_names = np.array(
+        [
+            [f"Player {team:04d}-{player:02d}" for player in range(roster_size)]
+            for team in range(teams)
+        ]
+    ).reshape(teams, 1, roster_size)
+    positions = rng.choice(POSITIONS, (teams, 1, roster_size))
+
+    player_games = pd.DataFrame(
+        {
+            "Team": np.broadcast_to(team_ids[:, None, None], shape).ravel(),
+            "Game": np.broadcast_to(np.arange(games)[None, :, None], shape).ravel(),
+            "Player": np.broadcast_to(player_names, shape).ravel(),
+            **{stat: values.ravel() for stat, values in box.items()},
+        }
+    )
+
+    # Team-game metrics and general_game fields
+    pace = rng.normal(68, 4, (teams, games))
+    team_pts = box["PTS"].sum(axis=-1)
+    opponent_pts = np.maximum(team_pts + rng.normal(0, 11, (teams, games)), 30)
+    adj_oe = rng.normal(103.3, 7, teams)
+    adj_de = rng.normal(103.3, 7, teams)
+
+    team_games = pd.DataFrame(
+        {
+            "Team": np.repeat(team_ids, games),
+            "Game": np.tile(np.arange(games), teams),
+            "Pace": pace.ravel(),
+            "Mins": 200.0,
+            "Pts": team_pts.ravel(),
+            "FGA": box["FGA"].sum(axis=-1).ravel(),
+            "FTA": box["FTA"].sum(axis=-1).ravel(),
+            "Baseline Pts/TSA": 1.0,
+            "Team_A_Score": team_pts.ravel(),
+            "Team_B_Score": opponent_pts.ravel(),
+            "Team_A_Adj_OE": np.repeat(adj_oe, games),
+            "Team_A_Adj_DE": np.repeat(adj_de, games),
+            "Team_B_Adj_OE": rng.normal(103.3, 7, teams * games),
+            "Team_B_Adj_DE": rng.normal(103.3, 7, teams * games),
+            "Team_A_OE": (team_pts / pace * 100).ravel(),
+            "Team_B_OE": (opponent_pts / pace * 100).ravel(),
+        }
+    )
+
+    # Season totals
+    season_box = {stat: values.sum(axis=1) for stat, values in box.items()}
+    season_players = pd.DataFrame(
+        {
+            "Team": np.repeat(team_ids, roster_size),
+            "Player": player_names.ravel(),
+            "Position_On_Court": positions.ravel(),
+            **{stat: values.ravel() for stat, values in season_box.items()},
+        }
+    )
+
+    total_minutes = 200.0 * games
+    season_teams = pd.DataFrame(
+        {
+            "Team": team_ids,
+            "Pace": pace.mean(axis=1),
+            "Mins": total_minutes,
+            "Total Minutes": total_minutes,
+            "Team Games": games,
+            "Team Pts": team_pts.sum(axis=1),
+            "Team FGA": season_box["FGA"].sum(axis=1),
+            "Team FTA": season_box["FTA"].sum(axis=1),
+            "Baseline Pts/TSA": 1.0,
+            **{
+                f"Team {stat}": season_box[stat].sum(axis=1)
+                for stat in ("TRB", "STL", "PF", "AST", "BLK")
+            },
+            "Team_A_Score": team_pts.mean(axis=1),
+            "Team_B_Score": opponent_pts.mean(axis=1),
+            "Team_A_Adj_OE": adj_oe,
+            "Team_A_Adj_DE": adj_de,
+            "Team_B_Adj_OE": 103.3,
+            "Team_B_Adj_DE": 103.3,
+            "Team_A_OE": team_pts.sum(axis=1) / pace.sum(axis=1) * 100,
+            "Team_B_OE": opponent_pts.sum(axis=1) / pace.sum(axis=1) * 100,
+        }
+    )
+
+    return season_players, season_teams, player_games, team_games
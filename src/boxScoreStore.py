@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+
+try:
+    from .playerBpm import BpmCalculator, as_column_table
+except ImportError:
+    from playerBpm import BpmCalculator, as_column_table
+
+# Columnar box score store: a directory holding one .npy file per column,
+# string columns as int32 codes into a shared string table, and a manifest.
+#
+#   manifest.json   {"version": 1, "rows": N, "columns": [...]}
+#   strings.json    string table (player names, positions, teams, ...)
+#   column_000.npy  ...
+
+STORE_VERSION = 1
+
+# Header names the box score exports use for the player column
+PLAYER_COLUMN_ALIASES = {"Unnamed: 1": "Player", "Starters": "Player"}
+
+
+def write_box_scores(table, path):
+    # table: DataFrame, mapping of equal length columns or structured array.
+    # Box score columns are stored as float64 so the engine can use the
+    # mapped files as is; other numeric columns keep their dtype.
+    table = as_column_table(table)
+    os.makedirs(path, exist_ok=True)
+
+    strings = []
+    string_codes = {}
+    columns = []
+    rows = None
+    for index, name in enumerate(table):
+        values = np.asarray(table[name])
+        if name in BpmCalculator.BOX_SCORE_COLUMNS:
+            values = values.astype(float)
+
+        if rows is None:
+            rows = len(values)
+        elif len(values) != rows:
+            raise ValueError(f"Column {name!r} has {len(values)} rows, expected {rows}")
+
+        kind = "numeric"
+        if values.dtype.kind in "OSU":
+            kind = "string"
+            codes = np.empty(len(values), dtype=np.int32)
+            for row, value in enumerate(values):
+                value = str(value)
+                if value not in string_codes:
+                    string_codes[value] = len(strings)
+                    strings.append(value)
+                codes[row] = string_codes[value]
+            values = codes
+        elif values.dtype.kind not in "biuf":
+            raise ValueError(f"Column {name!r} has unsupported dtype {values.dtype}")
+
+        file_name = f"column_{index:03d}.npy"
+        np.save(os.path.join(path, file_name), np.ascontiguousarray(values))
+        columns.append({"name": name, "file": file_name, "kind": kind})
+
+    with open(os.path.join(path, "strings.json"), "w") as file:
+        json.dump(strings, file)
+    with open(os.path.join(path, "manifest.json"), "w") as file:
+        json.dump(
+            {"version": STORE_VERSION, "rows": rows or 0, "columns": columns},
+            file,
+            indent=2,
+        )
+
+
+def convert_box_score_csv(csv_path, path, **read_csv_kwargs):
+    # One time CSV parse (with the player column renamed) into a store
+    import pandas as pd
+
+    table = pd.read_csv(csv_path, **read_csv_kwargs)
+    table = table.rename(columns=PLAYER_COLUMN_ALIASES)
+    write_box_scores(table, path)
+
+
+def load_box_scores(path, columns=None, mmap_mode="r"):
+    # Dict of column arrays, usable anywhere a season_df / game_df (or a
+    # league table) is expected. Numeric columns are memory mapped, not
+    # copied; string columns are decoded from the string table.
+    with open(os.path.join(path, "manifest.json")) as file:
+        manifest = json.load(file)
+    if manifest["version"] != STORE_VERSION:
+        raise ValueError(f"Unsupported box score store version {manifest['version']}")
+
+    if manifest["rows"] == 0:
+        mmap_mode = None  # Empty files can't be mapped
+
+    strings = None
+    table = {}
+    for column in manifest["columns"]:
+        if columns is not None and column["name"] not in columns:
+            continue
+
+        values = np.load(os.path.join(path, column["file"]), mmap_mode=mmap_mode)
+        if column["kind"] == "string":
+            if strings is None:
+                with open(os.path.join(path, "strings.json")) as file:
+                    strings = np.array(json.load(file), dtype=str)
+            values = strings[values]
+        table[column["name"]] = values
+
+    if columns is not None:
+        missing = set(columns) - set(table)
+        if missing:
+            raise KeyError(f"Columns not in box score store: {sorted(missing)}")
+
+    return table
@@ -0,0 +1,288 @@
+import numpy as np
+
+try:
+    from .playerBpm import (
+        BpmKernel,
+        as_column_table,
+        build_result_table,
+        coefficient_sets,
+        match_rows,
+        stack_coefficient_sets,
+    )
+except ImportError:
+    from playerBpm import (
+        BpmKernel,
+        as_column_table,
+        build_result_table,
+        coefficient_sets,
+        match_rows,
+        stack_coefficient_sets,
+    )
+
+
+def gather_columns(table, columns, rows):
+    # Table columns repeated onto every row that belongs to them
+    return {
+        column: np.asarray(table[column], dtype=float)[rows]
+        for column in columns
+        if column in table
+    }
+
+
+class LeagueBpmCalculator(BpmKernel):
+    SEASON_METRIC_COLUMNS = (
+        "Pace",
+        "Mins",
+        "Total Minutes",
+        "Team Pts",
+        "Team FGA",
+        "Team FTA",
+        "Baseline Pts/TSA",
+        "Team TRB",
+        "Team STL",
+        "Team PF",
+        "Team AST",
+        "Team BLK",
+    )
+
+    GAME_METRIC_COLUMNS = ("Pace", "Mins", "Pts", "FGA", "FTA", "Baseline Pts/TSA")
+
+    def __init__(
+        self,
+        season_players,
+        season_teams,
+        team_key="Team",
+        game_key="Game",
+        recenter_passes=BpmKernel.RECENTER_PASSES,
+        coefficient_set=None,
+        coefficient_set_key=None,
+        league_context=None,
+    ):
+        # coefficient_set: registered set of every team; coefficient_set_key:
+        # season_teams column naming each team's set, so one league can mix
+        # eras or leagues; league_context: shared LeagueContext of the season
+        season_players = as_column_table(season_players)
+        season_teams = as_column_table(season_teams)
+        self.season_players = season_players  # One row per team + player
+        self.season_teams = season_teams  # Season team metrics, one row per team
+        self.team_key = team_key
+        self.game_key = game_key
+        super().__init__(recenter_passes, coefficient_set, league_context)
+
+        # Distinct sets of the league stacked once (compiled, looked up by
+        # name) and the one every team uses
+        self.team_coefficient_sets = None
+        if coefficient_set_key is not None:
+            set_names, set_ids = np.unique(
+                np.asarray(season_teams[coefficient_set_key], dtype=str),
+                return_inverse=True,
+            )
+            self.team_coefficient_sets = (
+                stack_coefficient_sets(
+                    [coefficient_sets.get(name) for name in set_names]
+                ),
+                set_ids.reshape(-1),
+            )
+
+        # Team (row of season_teams) of every season player row
+        self.season_segments = match_rows(
+            [season_teams[team_key]], [season_players[team_key]]
+        )
+        self.season_metrics = gather_columns(
+            season_teams, self.SEASON_METRIC_COLUMNS, self.season_segments
+        )
+        self.season_coefficient_set = self.get_row_coefficient_set(self.season_segments)
+
+        # Arrays aligned with season_players rows, every team in one pass
+        season_columns = self.get_box_score_columns(season_players)
+        self.position = self.estimate_position(
+            season_columns,
+            self.calculate_pos_num(season_players["Position_On_Court"]),
+            self.season_metrics,
+            segments=self.season_segments,
+            coefficient_set=self.season_coefficient_set,
+        )
+        self.offensive_role = self.estimate_offensive_role(
+            season_columns,
+            self.season_metrics,
+            segments=self.season_segments,
+            coefficient_set=self.season_coefficient_set,
+        )
+
+    @classmethod
+    def row_scorer(
+        cls,
+        recenter_passes=BpmKernel.RECENTER_PASSES,
+        coefficient_set=None,
+        league_context=None,
+    ):
+        # Instance of the class that only runs calculate_game_row_stats on
+        # rows already matched by get_game_rows: its constants and kernels
+        # without season tables, e.g. for pool workers. Rows mixing sets
+        # pass their own coefficient_set (see get_row_coefficient_set).
+        scorer = cls.__new__(cls)
+        BpmKernel.__init__(scorer, recenter_passes, coefficient_set, league_context)
+        scorer.team_coefficient_sets = None
+        return scorer
+
+    def get_row_coefficient_set(self, team_rows):
+        # Coefficient set of rows belonging to season_teams rows team_rows:
+        # None (the league's own set) unless teams mix sets
+        if self.team_coefficient_sets is None:
+            return None
+        stacked_sets, set_ids = self.team_coefficient_sets
+        return stacked_sets.for_rows(set_ids[team_rows])
+
+    def calculate_league_bpm(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        general_game,
+        segments,
+        aggregation_level="game",
+        schedule=None,
+        coefficient_set=None,
+    ):
+        (bpm, obpm), percent_min, (adjustment_obj, _) = self.calculate_roster_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            general_game,
+            aggregation_level=aggregation_level,
+            segments=segments,
+            schedule=schedule,
+            coefficient_set=coefficient_set,
+        )
+        return bpm, obpm, percent_min, adjustment_obj
+
+    def get_schedule(self, teams_table):
+        # Team adjustment inputs, one row per team (or team-game)
+        return gather_columns(
+            teams_table, (*self.GENERAL_GAME_COLUMNS, "Pace"), slice(None)
+        )
+
+    def get_game_rows(self, player_games, team_games):
+        # Row aligned inputs of calculate_game_row_stats.
+        # player_games: one row per team + game + player box score
+        # team_games: one row per team + game with game metrics and the
+        # general_game fields (scores, adjusted and raw efficiencies)
+        player_games = as_column_table(player_games)
+        team_games = as_column_table(team_games)
+        game_segments = match_rows(
+            [team_games[self.team_key], team_games[self.game_key]],
+            [player_games[self.team_key], player_games[self.game_key]],
+        )
+        season_teams = self.season_players[self.team_key]
+        game_teams = player_games[self.team_key]
+        use_ids = "Player_ID" in self.season_players and "Player_ID" in player_games
+        season_rows = match_rows(
+            [season_teams]
+            + self.get_player_keys(self.season_players, [season_teams], use_ids),
+            [game_teams]
+            + self.get_player_keys(
+                player_games, [game_teams, player_games[self.game_key]], use_ids
+            ),
+        )
+
+        return (
+            self.get_box_score_columns(player_games),
+            self.position[season_rows],
+            self.offensive_role[season_rows],
+            gather_columns(team_games, self.GAME_METRIC_COLUMNS, game_segments),
+            gather_columns(team_games, self.GENERAL_GAME_COLUMNS, game_segments),
+            game_segments,
+        )
+
+    def get_team_rows(self, table):
+        # season_teams row of every row of a table with a team_key column
+        return match_rows(
+            [self.season_teams[self.team_key]],
+            [as_column_table(table)[self.team_key]],
+        )
+
+    def get_game_coefficient_set(self, player_games):
+        if self.team_coefficient_sets is None:
+            return None
+        return self.get_row_coefficient_set(self.get_team_rows(player_games))
+
+    def calculate_game_row_stats(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        general_game,
+        segments,
+        schedule=None,
+        coefficient_set=None,
+    ):
+        bpm, obpm, percent_min, adjustment_obj = self.calculate_league_bpm(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            general_game,
+            segments,
+            schedule=schedule,
+            coefficient_set=coefficient_set,
+        )
+
+        return {
+            "BPM": bpm,
+            "OBPM": obpm,
+            "DBPM": bpm - obpm,
+            "NET": self.calculate_net(
+                bpm, percent_min, adjustment_obj, general_game, metrics
+            ),
+        }
+
+    def calculate_game_stats(self, player_games, team_games, output="frame"):
+        player_games = as_column_table(player_games)
+        stats = self.calculate_game_row_stats(
+            *self.get_game_rows(player_games, team_games),
+            schedule=self.get_schedule(as_column_table(team_games)),
+            coefficient_set=self.get_game_coefficient_set(player_games),
+        )
+
+        return build_result_table(
+            {
+                self.team_key: np.asarray(player_games[self.team_key]),
+                self.game_key: np.asarray(player_games[self.game_key]),
+                "Player": np.asarray(player_games["Player"]),
+                **stats,
+            },
+            output,
+        )
+
+    def calculate_season_stats(self, output="frame"):
+        # Season level general_game fields are read from season_teams
+        general_game = gather_columns(
+            self.season_teams, self.GENERAL_GAME_COLUMNS, self.season_segments
+        )
+
+        bpm, obpm, percent_min, _ = self.calculate_league_bpm(
+            self.get_box_score_columns(self.season_players),
+            self.position,
+            self.offensive_role,
+            self.season_metrics,
+            general_game,
+            self.season_segments,
+            aggregation_level="season",
+            schedule=self.get_schedule(self.season_teams),
+            coefficient_set=self.season_coefficient_set,
+        )
+
+        return build_result_table(
+            {
+                self.team_key: np.asarray(self.season_players[self.team_key]),
+                "Player": np.asarray(self.season_players["Player"]),
+                "BPM": bpm,
+                "OBPM": obpm,
+                "DBPM": bpm - obpm,
+                "CONTRIB": percent_min * bpm,
+            },
+            output,
+        )
@@ -0,0 +1,144 @@
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+try:
+    from .playerBpm import as_column_table, build_result_table
+except ImportError:
+    from playerBpm import as_column_table, build_result_table
+
+# Per player stats summed over a lineup
+LINEUP_STATS = ("BPM", "OBPM", "DBPM")
+
+
+@lru_cache(maxsize=None)
+def get_lineup_combinations(players, size=5):
+    # (combinations, size) roster positions of every lineup, shared by all
+    # rosters of the same length
+    lineups = np.array(list(combinations(range(players), size)), dtype=int)
+    lineups.setflags(write=False)
+    return lineups
+
+
+def score_lineups(
+    table,
+    team_key=None,
+    size=5,
+    top_k=10,
+    min_position_spread=None,
+    max_offensive_role=None,
+    sort_stat="BPM",
+    output="frame",
+):
+    # Best `top_k` lineups of every team by minutes weighted sums of player
+    # stats: each player counts size * MP / lineup MP times, so a lineup of
+    # equal minute players scores the plain sum.
+    # table: one row per player with Player, MP, Position, Offensive_Role and
+    # LINEUP_STATS columns (and team_key for several teams).
+    # Filters: standard deviation of the lineup's positions at least
+    # min_position_spread, offensive roles summing to at most
+    # max_offensive_role.
+    table = as_column_table(table)
+    players = np.asarray(table["Player"])
+    if team_key is None:
+        team_labels, teams = None, np.zeros(len(players), dtype=int)
+    else:
+        team_labels, teams = np.unique(np.asarray(table[team_key]), return_inverse=True)
+        teams = teams.reshape(-1)
+
+    minutes = np.asarray(table["MP"], dtype=float)
+    position = np.asarray(table["Position"], dtype=float)
+    offensive_role = np.asarray(table["Offensive_Role"], dtype=float)
+    stats = {stat: np.asarray(table[stat], dtype=float) for stat in LINEUP_STATS}
+
+    # Rows of every team, contiguous after a stable sort
+    order = np.argsort(teams, kind="stable")
+    roster_sizes = np.bincount(teams)
+    roster_starts = np.concatenate([[0], np.cumsum(roster_sizes)[:-1]])
+
+    parts = []
+    for roster_size in np.unique(roster_sizes):
+        if roster_size < size:
+            continue
+
+        # (teams, lineups, size) rows of every lineup of every team with
+        # this roster size
+        team_ids = np.flatnonzero(roster_sizes == roster_size)
+        roster_rows = order[roster_starts[team_ids][:, None] + np.arange(roster_size)]
+        lineups = roster_rows[:, get_lineup_combinations(roster_size, size)]
+
+        lineup_minutes = minutes[lineups]
+        weights = size * lineup_minutes / lineup_minutes.sum(axis=-1, keepdims=True)
+        scores = {
+            stat: (weights * values[lineups]).sum(axis=-1)
+            for stat, values in stats.items()
+        }
+        position_spread = position[lineups].std(axis=-1)
+        role_total = offensive_role[lineups].sum(axis=-1)
+
+        keep = np.ones(lineups.shape[:2], dtype=bool)
+        if min_position_spread is not None:
+            keep &= position_spread >= min_position_spread
+        if max_offensive_role is not None:
+            keep &= role_total <= max_offensive_role
+        ranked = np.where(keep, scores[sort_stat], -np.inf)
+
+        # Top k per team without sorting every lineup
+        k = min(top_k, ranked.shape[1])
+        top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(
+            top,
+            np.argsort(-np.take_along_axis(ranked, top, axis=1), axis=1, kind="stable"),
+            axis=1,
+        )
+        valid = np.isfinite(np.take_along_axis(ranked, top, axis=1))
+
+        def pick(values):
+            return np.take_along_axis(values, top, axis=1)[valid]
+
+        part = {
+            "team": np.broadcast_to(team_ids[:, None], top.shape)[valid],
+            "Rank": np.broadcast_to(np.arange(1, k + 1), top.shape)[valid],
+            "rows": np.take_along_axis(lineups, top[..., None], axis=1)[valid],
+            **{stat: pick(values) for stat, values in scores.items()},
+            "Minutes": pick(lineup_minutes.sum(axis=-1)),
+            "Position_Spread": pick(position_spread),
+            "Offensive_Role": pick(role_total),
+        }
+        parts.append(part)
+
+    if not parts:
+        raise ValueError(f"No roster has {size} players")
+
+    lineups = {
+        name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+    }
+    order = np.lexsort((lineups["Rank"], lineups["team"]))
+
+    columns = {}
+    if team_labels is not None:
+        columns[team_key] = team_labels[lineups["team"][order]]
+    columns["Rank"] = lineups["Rank"][order]
+    for slot in range(size):
+        columns[f"Player_{slot + 1}"] = players[lineups["rows"][order, slot]]
+    for name in (*LINEUP_STATS, "Minutes", "Position_Spread", "Offensive_Role"):
+        columns[name] = lineups[name][order]
+
+    return build_result_table(columns, output)
+
+
+def score_league_lineups(league, **options):
+    # score_lineups over the season stats and position / offensive role
+    # estimates of a LeagueBpmCalculator
+    stats = league.calculate_season_stats(output="columns")
+    return score_lineups(
+        {
+            **stats,
+            "MP": league.get_box_score_columns(league.season_players)["MP"],
+            "Position": league.position,
+            "Offensive_Role": league.offensive_role,
+        },
+        team_key=league.team_key,
+        **options,
+    )
@@ -0,0 +1,220 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+try:
+    from .playerBpm import (
+        as_column_table,
+        build_result_table,
+    )
+except ImportError:
+    from playerBpm import (
+        as_column_table,
+        build_result_table,
+    )
+
+# Set once per worker process by init_worker
+worker_state = {}
+
+
+def share_arrays(arrays):
+    # Copy named arrays into one shared memory block. The layout
+    # {name: (shape, dtype, offset)} is small and picklable.
+    layout = {}
+    size = 0
+    for name, array in arrays.items():
+        layout[name] = (array.shape, array.dtype.str, size)
+        size += -(-array.nbytes // 8) * 8
+
+    shared_memory = SharedMemory(create=True, size=max(size, 1))
+    for name, shared_array in attach_arrays(shared_memory, layout).items():
+        shared_array[...] = arrays[name]
+
+    return shared_memory, layout
+
+
+def attach_arrays(shared_memory, layout):
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf, offset=offset)
+        for name, (shape, dtype, offset) in layout.items()
+    }
+
+
+def unsort_arrays(shared_memory, layout, order):
+    # Copy shared arrays out of the block, undoing the row permutation
+    unsorted = {}
+    for name, values in attach_arrays(shared_memory, layout).items():
+        unsorted[name] = np.empty(len(order))
+        unsorted[name][order] = values
+    return unsorted
+
+
+def split_arrays(arrays, start=None, end=None):
+    # "group/name" arrays back into {group: {name: rows[start:end]}}
+    groups = {}
+    for key, array in arrays.items():
+        group, _, name = key.partition("/")
+        groups.setdefault(group, {})[name] = array[start:end]
+    return groups
+
+
+def find_shard_bounds(team_codes, shards):
+    # Cut rows (sorted by team) into about `shards` pieces of similar size
+    # without splitting a team
+    team_starts = np.flatnonzero(np.diff(team_codes)) + 1
+    targets = np.linspace(0, len(team_codes), shards + 1)[1:-1]
+    cuts = []
+    if len(team_starts):
+        nearest = np.searchsorted(team_starts, targets)
+        cuts = team_starts[np.minimum(nearest, len(team_starts) - 1)]
+
+    bounds = np.unique(np.concatenate([[0], cuts, [len(team_codes)]])).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def init_worker(
+    calculator_class,
+    recenter_passes,
+    coefficient_set,
+    stacked_sets,
+    league_context,
+    input_name,
+    input_layout,
+    output_name,
+    output_layout,
+):
+    input_memory = SharedMemory(name=input_name)
+    output_memory = SharedMemory(name=output_name)
+    inputs = attach_arrays(input_memory, input_layout)
+
+    # Game level scoring only reads class constants, so the worker needs no
+    # season tables; coefficient sets are the parent's compiled ones
+    calculator = calculator_class.row_scorer(
+        recenter_passes, coefficient_set, league_context
+    )
+
+    worker_state.update(
+        memory=(input_memory, output_memory),
+        calculator=calculator,
+        stacked_sets=stacked_sets,
+        inputs=inputs,
+        outputs=attach_arrays(output_memory, output_layout),
+    )
+
+
+def score_shard(bounds):
+    start, end = bounds
+    rows = split_arrays(worker_state["inputs"], start, end)
+
+    # Leagues mixing coefficient sets carry each row's set
+    coefficient_set = None
+    if worker_state["stacked_sets"] is not None:
+        coefficient_set = worker_state["stacked_sets"].for_rows(
+            rows["rows"]["coefficient_set_ids"]
+        )
+
+    stats = worker_state["calculator"].calculate_game_row_stats(
+        rows["columns"],
+        rows["rows"]["position"],
+        rows["rows"]["offensive_role"],
+        rows["metrics"],
+        rows["general_game"],
+        rows["rows"]["segments"],
+        coefficient_set=coefficient_set,
+    )
+    for stat, values in stats.items():
+        worker_state["outputs"][stat][start:end] = values
+
+    return bounds
+
+
+def score_games_parallel(
+    league,
+    player_games,
+    team_games,
+    processes=None,
+    shards_per_process=4,
+    mp_context=None,
+    output="frame",
+):
+    # Same result as league.calculate_game_stats, with teams sharded over a
+    # process pool. Inputs and outputs live in shared memory; tasks only
+    # carry (start, end) row bounds.
+    processes = processes or multiprocessing.cpu_count()
+    player_games = as_column_table(player_games)
+    columns, position, offensive_role, metrics, general_game, segments = (
+        league.get_game_rows(player_games, team_games)
+    )
+
+    # Stable sort keeps every team-game's rows in input order, so the
+    # segment sums (and therefore the results) match the serial path exactly
+    team_codes = np.unique(
+        np.asarray(player_games[league.team_key]), return_inverse=True
+    )[1].reshape(-1)
+    order = np.argsort(team_codes, kind="stable")
+
+    inputs = {
+        "rows/position": position[order],
+        "rows/offensive_role": offensive_role[order],
+        "rows/segments": segments[order],
+    }
+    for group, arrays in (
+        ("columns", columns),
+        ("metrics", metrics),
+        ("general_game", general_game),
+    ):
+        for name, array in arrays.items():
+            inputs[f"{group}/{name}"] = array[order]
+
+    stacked_sets = None
+    if league.team_coefficient_sets is not None:
+        stacked_sets, set_ids = league.team_coefficient_sets
+        inputs["rows/coefficient_set_ids"] = set_ids[
+            league.get_team_rows(player_games)
+        ][order]
+
+    stat_names = ("BPM", "OBPM", "DBPM", "NET")
+    input_memory, input_layout = share_arrays(inputs)
+    output_memory, output_layout = share_arrays(
+        {stat: np.zeros(len(order)) for stat in stat_names}
+    )
+
+    try:
+        shard_bounds = find_shard_bounds(
+            team_codes[order], processes * shards_per_process
+        )
+        context = multiprocessing.get_context(mp_context)
+        with context.Pool(
+            processes,
+            initializer=init_worker,
+            initargs=(
+                type(league),
+                league.recenter_passes,
+                league.coefficient_set,
+                stacked_sets,
+                league.league_context,
+                input_memory.name,
+                input_layout,
+                output_memory.name,
+                output_layout,
+            ),
+        ) as pool:
+            pool.map(score_shard, shard_bounds)
+
+        stats = unsort_arrays(output_memory, output_layout, order)
+    finally:
+        input_memory.close()
+        input_memory.unlink()
+        output_memory.close()
+        output_memory.unlink()
+
+    return build_result_table(
+        {
+            league.team_key: np.asarray(player_games[league.team_key]),
+            league.game_key: np.asarray(player_games[league.game_key]),
+            "Player": np.asarray(player_games["Player"]),
+            **{stat: stats[stat] for stat in stat_names},
+        },
+        output,
+    )
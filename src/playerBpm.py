@@ -1,8 +1,244 @@
 import math
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from functools import cached_property
+from types import MappingProxyType
+
 import numpy as np
 
+try:
+    from .stageMetrics import timed_stage
+except ImportError:
+    from stageMetrics import timed_stage
+
+# Result layouts of calculate_bpm / calculate_all_stats and the batch APIs
+RESULT_OUTPUTS = ("dict", "columns", "frame", "records")
+
+
+def build_result_table(columns, output="frame"):
+    # One array per column returned as is ("columns"), as a DataFrame
+    # ("frame") or as a NumPy structured array ("records")
+    if output == "columns":
+        return columns
+
+    if output == "frame":
+        import pandas as pd
+
+        return pd.DataFrame(columns, copy=False)
+
+    if output == "records":
+        arrays = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            # Names and keys become fixed width strings
+            arrays[name] = values.astype(str) if values.dtype == object else values
+
+        table = np.empty(
+            len(next(iter(arrays.values()), ())),
+            dtype=[(name, values.dtype) for name, values in arrays.items()],
+        )
+        for name, values in arrays.items():
+            table[name] = values
+        return table
+
+    raise ValueError(f"Unknown output {output!r}, expected one of {RESULT_OUTPUTS}")
+
+
+def as_column_table(table):
+    # Tables are anything indexable by column name: DataFrames, mappings of
+    # column arrays, or NumPy structured arrays (converted to a dict of field
+    # views here so `column in table` works)
+    if isinstance(table, np.ndarray) and table.dtype.names:
+        return {name: table[name] for name in table.dtype.names}
+    return table
+
+
+def match_rows(table_keys, query_keys):
+    # Index of the table row for every query row. Both arguments are lists
+    # of key columns (e.g. [team, game]); keys must be unique in the table.
+    table_code = np.zeros(len(table_keys[0]), dtype=np.int64)
+    query_code = np.zeros(len(query_keys[0]), dtype=np.int64)
+
+    for table_column, query_column in zip(table_keys, query_keys):
+        table_column = np.asarray(table_column)
+        uniques, inverse = np.unique(
+            np.concatenate([table_column, np.asarray(query_column)]),
+            return_inverse=True,
+        )
+        inverse = inverse.reshape(-1)
+        table_code = table_code * len(uniques) + inverse[: len(table_column)]
+        query_code = query_code * len(uniques) + inverse[len(table_column) :]
+
+    order = np.argsort(table_code, kind="stable")
+    sorted_code = table_code[order]
+    if np.any(sorted_code[1:] == sorted_code[:-1]):
+        raise ValueError("Duplicate keys in table")
+
+    rows = np.searchsorted(sorted_code, query_code)
+    rows = np.minimum(rows, len(sorted_code) - 1)
+    missing = sorted_code[rows] != query_code
+    if np.any(missing):
+        missing_keys = list(
+            zip(*(np.asarray(column)[missing].tolist() for column in query_keys))
+        )
+        raise KeyError(
+            f"{len(missing_keys)} rows have no matching key, "
+            f"e.g. {missing_keys[:5]}"
+        )
+
+    return order[rows]
+
+
+def occurrence_index(*key_columns):
+    # 0 for the first row with a given key, 1 for the second and so on
+    codes = np.zeros(len(key_columns[0]), dtype=np.int64)
+    for key_column in key_columns:
+        uniques, inverse = np.unique(np.asarray(key_column), return_inverse=True)
+        codes = codes * len(uniques) + inverse.reshape(-1)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    run_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    run_lengths = np.diff(np.r_[run_starts, len(codes)])
+
+    occurrences = np.empty(len(codes), dtype=np.int64)
+    occurrences[order] = np.arange(len(codes)) - np.repeat(run_starts, run_lengths)
+    return occurrences
+
+
+def check_unique_names(players, *group_columns):
+    # Names stand in for players only while no two rows of a group (e.g. a
+    # team, or a team-game) share one; same-named players need Player_ID
+    players = np.asarray(players)
+    shared = occurrence_index(*group_columns, players) > 0
+    if np.any(shared):
+        raise ValueError(
+            f"Players share a name, e.g. {sorted(set(players[shared].tolist()))[:5]}; "
+            "add Player_ID columns to tell them apart"
+        )
+
+
+@dataclass(frozen=True)
+class SeasonContext:
+    # Season level estimates shared by every game of a team. Frozen with
+    # read-only arrays so one instance can be reused across calculators
+    # and threads; build it with BpmCalculator.calculate_season_context.
+    # Player ids are season_df rows, position / offensive_role are aligned
+    # with them and player_ids maps the names no teammate shares to their
+    # id. recenter_passes
+    # and coefficient_set (name) record how the estimates were made.
+    players: tuple
+    player_ids: MappingProxyType
+    position: np.ndarray
+    offensive_role: np.ndarray
+    recenter_passes: int
+    coefficient_set: str
+
+
+@dataclass(frozen=True)
+class LeagueContext:
+    # League wide constants of a season, shared by reference with every
+    # calculator and batch job of it; build it once with
+    # BpmCalculator.calculate_league_context
+    avg_rating: float
+    baseline_pts_tsa: float
+
+
+def compile_coefficients(coefficients, metrics):
+    # [Pos_1 row, Pos_5 row] of a coefficient dict, columns ordered by metrics
+    compiled = np.array(
+        [[coefficients[f"Pos_{pos}_{metric}"] for metric in metrics] for pos in (1, 5)],
+        dtype=float,
+    )
+    compiled.setflags(write=False)
+    return compiled
+
+
+def compile_position_constants(position_constants):
+    compiled = np.array(
+        [
+            position_constants[name]
+            for name in ("Pos_1", "Pos_3", "Pos_5", "Offensive_Role_Slope")
+        ],
+        dtype=float,
+    )
+    compiled.setflags(write=False)
+    return compiled
+
+
+class PlayerBatch(Mapping):
+    # Struct of arrays box score container: one contiguous float64 array per
+    # column, looked up by column name like a table or a player row. A single
+    # player is a batch of 0-d views into the same arrays.
+
+    COLUMNS = (
+        "MP",
+        "FGA",
+        "FTA",
+        "3P",
+        "AST",
+        "TOV",
+        "ORB",
+        "DRB",
+        "TRB",
+        "STL",
+        "BLK",
+        "PF",
+        "PTS",
+        "TSA",
+    )
+
+    # Column -> attribute holding it ("3P" is not an identifier)
+    SLOTS = {column: "FG3" if column == "3P" else column for column in COLUMNS}
+
+    __slots__ = tuple(SLOTS.values())
+
+    def __init__(self, columns):
+        # columns: column -> array, used as is (no copy)
+        for column, slot in self.SLOTS.items():
+            setattr(self, slot, columns[column])
+
+    @classmethod
+    def from_table(cls, table):
+        # Float columns of a DataFrame, mapping or batch; already contiguous
+        # float64 columns (memory maps included) are not copied
+        return cls(
+            {
+                column: np.ascontiguousarray(table[column], dtype=float)
+                for column in cls.COLUMNS
+            }
+        )
+
+    def __getitem__(self, column):
+        return getattr(self, self.SLOTS[column])
+
+    def __iter__(self):
+        return iter(self.COLUMNS)
+
+    def __len__(self):
+        return len(self.COLUMNS)
+
+    def __repr__(self):
+        return f"PlayerBatch({self.size} players)"
+
+    @property
+    def size(self):
+        return np.size(self.MP)
+
+    def player(self, row):
+        return PlayerBatch({column: self[column][row, ...] for column in self.COLUMNS})
+
+    def take(self, rows):
+        return PlayerBatch({column: self[column][rows] for column in self.COLUMNS})
+
+
+class BpmKernel:
+    # Row kernels shared by every calculator: position / offensive role
+    # estimates, roster BPM and team adjustments over box score columns and
+    # the metrics passed in. Holds no tables of its own, so league and
+    # trajectory calculators build on it without BpmCalculator's per team
+    # season_df / game_df state.
 
-class BpmCalculator:
     # BPM Constants and Coefficients
     BPM_COEFFICIENTS = {
         "Pos_1_Adj_Pt": 0.860,
@@ -82,6 +318,7 @@ class BpmCalculator:
     }
 
     # There are different coef for pre 1971, but that doesn't impact my data
+    # (register a coefficient set for them if it ever does)
     POSITION_COEFFICIENTS = {
         "Intercept": 2.130,
         "Perc_Of_TRB": 8.668,
@@ -104,28 +341,178 @@ class BpmCalculator:
         "F": 3.5,
         "?": 3,
     }
-    _TSA_COEF = BPM_COEFFICIENTS["Pos_1_FTA"] / BPM_COEFFICIENTS["Pos_1_FGA"]
 
     SEASON_STATS = {"AVG_RATING": 103.3}
 
-    def __init__(self, season_df, game_df, season_team_metrics, game_team_metrics):
-        self.season_df = season_df  # DataFrame containing season level data
-        self.game_df = game_df  # DataFrame containing game level data
-        self.season_team_metrics = season_team_metrics  # Seasonal team metrics
-        self.game_team_metrics = game_team_metrics  # Game-specific team metrics
+    # Box score columns the roster-wide (columnar) path reads from a table
+    BOX_SCORE_COLUMNS = PlayerBatch.COLUMNS
+
+    # Column order of the p100 matrix and the matching coefficient names
+    P100_METRICS = (
+        "Adj_Pt",
+        "FGA",
+        "FTA",
+        "3FG",
+        "AST",
+        "TO",
+        "ORB",
+        "DRB",
+        "TRB",
+        "STL",
+        "BLK",
+        "PF",
+    )
+    BPM_METRICS = (
+        "Adj_Pt",
+        "FGA",
+        "FTA",
+        "3FG_Bonus",
+        "AST",
+        "TO",
+        "ORB",
+        "DRB",
+        "TRB",
+        "STL",
+        "BLK",
+        "PF",
+    )
+    # Metrics interpolated on offensive role instead of position
+    ROLE_METRICS = ("FGA", "FTA")
+    IS_ROLE_METRIC = np.isin(BPM_METRICS, ROLE_METRICS)
+    IS_ROLE_METRIC.setflags(write=False)
+    METRIC_INDEX = {metric: index for index, metric in enumerate(BPM_METRICS)}
+
+    # Registered coefficient set used unless a calculator or call picks
+    # another; the tables above are the "default" set
+    COEFFICIENT_SET = "default"
+
+    # Class tables and the compile_coefficient_set arguments they fill
+    COEFFICIENT_TABLES = {
+        "BPM_COEFFICIENTS": "bpm_coefficients",
+        "OBPM_COEFFICIENTS": "obpm_coefficients",
+        "BPM_POSITION_CONSTANTS": "bpm_position_constants",
+        "OBPM_POSITION_CONSTANTS": "obpm_position_constants",
+        "POSITION_COEFFICIENTS": "position_coefficients",
+        "OFFENSIVE_ROLE_COEFFICIENTS": "offensive_role_coefficients",
+    }
+
+    # Coefficient sets scored together by calculate_all_stats
+    BPM_TYPES = ("default", "offense")
+
+    # Game (or season) level team fields read by the team adjustment
+    GENERAL_GAME_COLUMNS = (
+        "Team_A_Score",
+        "Team_B_Score",
+        "Team_A_Adj_OE",
+        "Team_A_Adj_DE",
+        "Team_B_Adj_OE",
+        "Team_B_Adj_DE",
+        "Team_A_OE",
+        "Team_B_OE",
+    )
+
+    # Number of times position / offensive role estimates are re-centered
+    RECENTER_PASSES = 3
+
+    def __init_subclass__(cls, **kwargs):
+        # A subclass overriding any of the tables scores with its own set,
+        # validated and compiled once here, unless it names a set itself
+        super().__init_subclass__(**kwargs)
+        if "COEFFICIENT_SET" not in cls.__dict__ and any(
+            table in cls.__dict__ for table in cls.COEFFICIENT_TABLES
+        ):
+            cls.COEFFICIENT_SET = compile_coefficient_set(
+                cls.__qualname__,
+                **{
+                    argument: getattr(cls, table)
+                    for table, argument in cls.COEFFICIENT_TABLES.items()
+                },
+            )
 
-        # Dict with key = Name, Value = Position Coef
-        # Season Level Coefficients, used to calculate per game BPM
-        self.position = self.calculate_position(season_df, season_team_metrics)
-        self.offensive_role = self.calculate_offensive_role(
-            season_df, season_team_metrics
+    def __init__(
+        self, recenter_passes=RECENTER_PASSES, coefficient_set=None, league_context=None
+    ):
+        self.recenter_passes = recenter_passes
+        self.coefficient_set = coefficient_sets.get(
+            self.COEFFICIENT_SET if coefficient_set is None else coefficient_set
+        )
+        # LeagueContext of the season; without one AVG_RATING is the
+        # SEASON_STATS constant and metrics carry Baseline Pts/TSA
+        self.league_context = league_context
+
+    @classmethod
+    def calculate_league_context(cls, season_teams, coefficient_set=None):
+        # LeagueContext of a season team table (one row per team): average
+        # of every team's adjusted offensive and defensive efficiency and
+        # pooled Pts/TSA (TSA weighted by the class's or the given set)
+        season_teams = as_column_table(season_teams)
+        columns = {
+            column: np.asarray(season_teams[column], dtype=float)
+            for column in (
+                "Team_A_Adj_OE",
+                "Team_A_Adj_DE",
+                "Team Pts",
+                "Team FGA",
+                "Team FTA",
+            )
+        }
+        tsa_coef = coefficient_sets.get(
+            cls.COEFFICIENT_SET if coefficient_set is None else coefficient_set
+        ).tsa_coef
+        team_tsa = columns["Team FGA"] + tsa_coef * columns["Team FTA"]
+
+        return LeagueContext(
+            avg_rating=float(
+                (columns["Team_A_Adj_OE"].mean() + columns["Team_A_Adj_DE"].mean()) / 2
+            ),
+            baseline_pts_tsa=float(columns["Team Pts"].sum() / team_tsa.sum()),
         )
 
-        # Maybe reasign AVG_RATING on init
+    def get_avg_rating(self):
+        if self.league_context is None:
+            return self.SEASON_STATS["AVG_RATING"]
+        return self.league_context.avg_rating
+
+    def get_baseline_pts_tsa(self, metrics):
+        # Metrics may still carry their own baseline
+        if "Baseline Pts/TSA" in metrics or self.league_context is None:
+            return metrics["Baseline Pts/TSA"]
+        return self.league_context.baseline_pts_tsa
+
+    def get_player_keys(self, table, group_columns=(), use_ids=False):
+        # Player_ID when both tables have one, otherwise the name, which must
+        # be unique within the group
+        if use_ids:
+            return [table["Player_ID"]]
+        check_unique_names(table["Player"], *group_columns)
+        return [table["Player"]]
+
+    @timed_stage("row_matching")
+    def match_player_rows(self, season_df, stats_df):
+        use_ids = "Player_ID" in season_df and "Player_ID" in stats_df
+        return match_rows(
+            self.get_player_keys(season_df, use_ids=use_ids),
+            self.get_player_keys(stats_df, use_ids=use_ids),
+        )
+
+    def get_general_game(self, general_game):
+        # Scalars for one game, float arrays for a schedule table (one row
+        # per game: DataFrame, mapping of columns or structured array)
+        general_game = as_column_table(general_game)
+        return {
+            column: (
+                general_game[column]
+                if np.ndim(general_game[column]) == 0
+                else np.asarray(general_game[column], dtype=float)
+            )
+            for column in self.GENERAL_GAME_COLUMNS
+            if column in general_game
+        }
 
     def calculate_lead_bonus(
         self, general_game, aggregation_level="game", team_rating=None, pace=None
     ):
+        general_game = self.get_general_game(general_game)
         if aggregation_level == "season":
             avg_lead = (team_rating * pace) / 100 / 2
         else:
@@ -135,15 +522,22 @@ class BpmCalculator:
 
         return lead_bonus
 
+    @timed_stage("team_adjustment")
     def calculate_team_adjustment(
         self,
         general_game,
         player_contribution_sum,
         bpm_type="default",
         aggregation_level="game",
+        pace=None,
     ):
+        # general_game and pace may be a schedule of games, with one
+        # player_contribution_sum per game. Season pace only feeds the season
+        # level lead bonus.
+        general_game = self.get_general_game(general_game)
+
         # bt_avg_rating .. I believe this is the avg_adj_oe?
-        bt_avg_rating = self.SEASON_STATS["AVG_RATING"]
+        bt_avg_rating = self.get_avg_rating()
 
         Team_A_ORtg = general_game["Team_A_Adj_OE"] - bt_avg_rating
         Team_A_DRtg = bt_avg_rating - general_game["Team_A_Adj_DE"]
@@ -155,7 +549,7 @@ class BpmCalculator:
             general_game,
             aggregation_level,
             team_rating=(Team_A_DRtg + Team_A_ORtg),
-            pace=self.season_team_metrics["Pace"],
+            pace=pace,
         )
 
         team_a_lead_bonus = lead_bonus
@@ -200,37 +594,19 @@ class BpmCalculator:
             "Team_B_DRtg": Team_B_DRtg,
             "Rating_Total_A": Team_A_ORtg + Team_A_DRtg,
             "Rating_Total_B": Team_B_ORtg + Team_B_DRtg,
+            "Lead_Bonus": lead_bonus,
         }
 
-    def calculate_raw_bpm(self, player, bpm_type="default", aggregation_level="game"):
-        per_one_hundred_possessions_stats = None
-        if aggregation_level == "game":
-            per_one_hundred_possessions_stats = self.calculate_p_100_p_stats(
-                player, metrics=self.game_team_metrics
-            )
-        else:
-            per_one_hundred_possessions_stats = self.calculate_p_100_p_stats(
-                player, metrics=self.season_team_metrics, aggregation_level="season"
-            )
-        scoring = self.calculate_scoring(
-            player, per_one_hundred_possessions_stats, bpm_type
-        )
-        ballhandling = self.calculate_ballhandling(
-            player, per_one_hundred_possessions_stats, bpm_type
-        )
-        rebounding = self.calculate_rebounding(
-            player, per_one_hundred_possessions_stats, bpm_type
-        )
-        defense = self.calculate_defense(
-            player, per_one_hundred_possessions_stats, bpm_type
-        )
-        position_adjustment = self.calculate_position_adjustment(player, bpm_type)
-        return scoring + ballhandling + rebounding + defense + position_adjustment
-
-    def calculate_p_100_p_stats(self, player, metrics, aggregation_level="game"):
+    @timed_stage("p100")
+    def calculate_p_100_p_stats(
+        self, player, metrics, aggregation_level="game", coefficient_set=None
+    ):
         possessions = self.calculate_possessions(player, metrics)
         adj_pt = self.calculate_adj_pts(
-            player, metrics=metrics, aggregation_level=aggregation_level
+            player,
+            metrics=metrics,
+            aggregation_level=aggregation_level,
+            coefficient_set=coefficient_set,
         )
 
         per_100_possessions = {
@@ -249,34 +625,28 @@ class BpmCalculator:
         }
         return per_100_possessions
 
-    def calculate_scoring(
-        self, player, per_one_hundred_possessions_stats, bpm_type="default"
-    ):
-        # Define the metrics for scoring
-        metrics_bpm = ["Adj_Pt", "FGA", "FTA", "3FG_Bonus"]
-        p100_metrics = ["Adj_Pt", "FGA", "FTA", "3FG"]
-
-        # Compute the BPM values and p100p values
-        bpm_values = [
-            self.calculate_bpm_value(player, metric, bpm_type) for metric in metrics_bpm
-        ]
-
-        p100p_values = [
-            per_one_hundred_possessions_stats[metric] for metric in p100_metrics
-        ]
-
-        return np.dot(bpm_values, p100p_values)
-
-    def calculate_pts_tsa(self, player):
+    def calculate_pts_tsa(self, player, coefficient_set=None):
         # Why not just make player row in the season or game data?
-        if player["TSA"] == 0:
-            return 0
-
-        true_tsa = player["FGA"] + self._TSA_COEF * player["FTA"]
-        return player["PTS"] / true_tsa
+        tsa_coef = self.get_coefficient_set(coefficient_set).tsa_coef
+        true_tsa = player["FGA"] + tsa_coef * player["FTA"]
+
+        if np.ndim(true_tsa) == 0:
+            if player["TSA"] == 0:
+                return 0
+            return player["PTS"] / true_tsa
+
+        # Whole roster of columns, players without attempts get 0
+        pts_tsa = np.zeros(np.shape(true_tsa))
+        np.divide(
+            player["PTS"], true_tsa, out=pts_tsa, where=np.asarray(player["TSA"]) != 0
+        )
+        return pts_tsa
 
-    def calculate_adj_pts(self, player, metrics, aggregation_level="game"):
-        pts_tsa = self.calculate_pts_tsa(player)
+    def calculate_adj_pts(
+        self, player, metrics, aggregation_level="game", coefficient_set=None
+    ):
+        pts_tsa = self.calculate_pts_tsa(player, coefficient_set)
+        tsa_coef = self.get_coefficient_set(coefficient_set).tsa_coef
 
         pts_col, fga_col, fta_col = "Pts", "FGA", "FTA"
         if aggregation_level == "season":
@@ -285,10 +655,10 @@ class BpmCalculator:
             fta_col = "Team " + fta_col
 
         team_pts_tsa = metrics[pts_col] / (
-            metrics[fga_col] + metrics[fta_col] * self._TSA_COEF
+            metrics[fga_col] + metrics[fta_col] * tsa_coef
         )
-        baseline_pts_tsa = metrics["Baseline Pts/TSA"]
-        tsa = player["FGA"] + self._TSA_COEF * player["FTA"]
+        baseline_pts_tsa = self.get_baseline_pts_tsa(metrics)
+        tsa = player["FGA"] + tsa_coef * player["FTA"]
 
         adj_pts = ((pts_tsa - team_pts_tsa) + baseline_pts_tsa) * tsa
         return adj_pts
@@ -299,19 +669,558 @@ class BpmCalculator:
         possessions = mp * pace / 40
         return possessions
 
-    def calculate_thresh_pts(self, player, metrics):
-        pts_tsa = self.calculate_pts_tsa(player)
+    def calculate_thresh_pts(self, player, metrics, coefficient_set=None):
+        pts_tsa = self.calculate_pts_tsa(player, coefficient_set)
+        coefficients = self.get_coefficient_set(coefficient_set)
 
         pts_col, fga_col, fta_col = "Team Pts", "Team FGA", "Team FTA"
         team_pts_tsa = metrics[pts_col] / (
-            metrics[fga_col] + metrics[fta_col] * self._TSA_COEF
+            metrics[fga_col] + metrics[fta_col] * coefficients.tsa_coef
+        )
+        tsa = player["FGA"] + coefficients.tsa_coef * player["FTA"]
+        offensive_role_pt_threshold = coefficients.offensive_role_coefficient(
+            "Pt_Threshold"
         )
-        tsa = player["FGA"] + self._TSA_COEF * player["FTA"]
-        offensive_role_pt_threshold = self.OFFENSIVE_ROLE_COEFFICIENTS["Pt_Threshold"]
 
         thresh_pts = tsa * (pts_tsa - (team_pts_tsa + offensive_role_pt_threshold))
         return thresh_pts
 
+    def segment_totals(self, values, segments, length=0):
+        # Totals per team (segments = team index per row), at least `length`
+        # of them
+        return np.bincount(segments, weights=values, minlength=length)
+
+    def gather_segment_values(self, values, segments):
+        # Per segment values of a dict repeated onto every row of the segment
+        return {
+            name: value[segments] if np.ndim(value) else value
+            for name, value in values.items()
+        }
+
+    def segment_sum(self, values, segments=None):
+        # Totals per team broadcast back onto the rows. Without segments
+        # every row belongs to one team.
+        if segments is None:
+            return np.sum(values)
+        return self.segment_totals(values, segments)[segments]
+
+    def recenter_estimates(
+        self, trim_one, minutes, total_minutes, passes=None, segments=None
+    ):
+        # Shift the minute weighted team average toward 3, re-trimming to
+        # [1, 5] after each pass. Shifts always apply to the first trim.
+        if passes is None:
+            passes = self.recenter_passes
+
+        trimmed = trim_one
+        shift = 0
+        for _ in range(passes):
+            tm_avg = self.segment_sum(trimmed * minutes, segments) / total_minutes
+            shift = shift + (tm_avg - 3)
+            trimmed = np.clip(trim_one - shift, 1, 5)
+
+        return trimmed
+
+    @timed_stage("offensive_role")
+    def estimate_offensive_role(
+        self, columns, season_metrics, passes=None, segments=None, coefficient_set=None
+    ):
+        mp = columns["MP"]
+        coefficient = self.get_coefficient_set(
+            coefficient_set
+        ).offensive_role_coefficient
+
+        thresh_pts = self.calculate_thresh_pts(columns, season_metrics, coefficient_set)
+        total_thresh_pts = self.segment_sum(thresh_pts, segments)
+
+        percent_min = mp / (season_metrics["Total Minutes"] / 5)
+        percent_of_ast = (columns["AST"] / season_metrics["Team AST"]) / percent_min
+        precent_of_threshpts = thresh_pts / total_thresh_pts / percent_min
+
+        est_off_role_one = (
+            coefficient("Intercept")
+            + coefficient("Perc_Of_AST") * percent_of_ast
+            + coefficient("Perc_OF_ThreshPts") * precent_of_threshpts
+        )
+
+        or_min_adj_one = (
+            est_off_role_one * mp + coefficient("Default_Pos") * coefficient("Min_Wt")
+        ) / (mp + coefficient("Min_Wt"))
+
+        trim_one = np.clip(or_min_adj_one, 1, 5)
+        return self.recenter_estimates(
+            trim_one, mp, season_metrics["Total Minutes"], passes, segments
+        )
+
+    def calculate_offensive_role(self, season_df, season_metrics, passes=None):
+        position_constants = self.estimate_offensive_role(
+            self.get_box_score_columns(season_df), season_metrics, passes
+        )
+
+        offensive_role_lookup = dict(zip(list(season_df["Player"]), position_constants))
+        return offensive_role_lookup
+
+    def calculate_pos_num(self, positions_on_court):
+        # Map the (few) distinct position labels instead of every row
+        labels, inverse = np.unique(
+            np.asarray(positions_on_court, dtype=str), return_inverse=True
+        )
+        pos_nums = np.array([self.POS_NUM.get(label, 3) for label in labels], float)
+        return pos_nums[inverse.reshape(-1)]
+
+    @timed_stage("position")
+    def estimate_position(
+        self,
+        columns,
+        pos_num,
+        season_metrics,
+        passes=None,
+        segments=None,
+        coefficient_set=None,
+    ):
+        mp = columns["MP"]
+        coefficient = self.get_coefficient_set(coefficient_set).position_coefficient
+
+        percent_min = mp / (season_metrics["Total Minutes"] / 5)
+        percent_of_trb = (columns["TRB"] / season_metrics["Team TRB"]) / percent_min
+        percent_of_stl = (columns["STL"] / season_metrics["Team STL"]) / percent_min
+        percent_of_pf = (columns["PF"] / season_metrics["Team PF"]) / percent_min
+        percent_of_ast = (columns["AST"] / season_metrics["Team AST"]) / percent_min
+        percent_of_blk = (columns["BLK"] / season_metrics["Team BLK"]) / percent_min
+
+        est_pos_1 = (
+            coefficient("Intercept")
+            + coefficient("Perc_Of_TRB") * percent_of_trb
+            + coefficient("Perc_Of_STL") * percent_of_stl
+            + coefficient("Perc_Of_PF") * percent_of_pf
+            + coefficient("Perc_Of_AST") * percent_of_ast
+            + coefficient("Perc_Of_BLK") * percent_of_blk
+        )
+
+        min_adj_1 = (est_pos_1 * mp + pos_num * coefficient("Min_Wt")) / (
+            mp + coefficient("Min_Wt")
+        )
+
+        trim_one = np.clip(min_adj_1, 1, 5)
+        return self.recenter_estimates(
+            trim_one, mp, season_metrics["Total Minutes"], passes, segments
+        )
+
+    def calculate_position(self, season_df, season_metrics, passes=None):
+        position_constants = self.estimate_position(
+            self.get_box_score_columns(season_df),
+            self.calculate_pos_num(season_df["Position_On_Court"]),
+            season_metrics,
+            passes,
+        )
+
+        name_to_pos_constant = dict(zip(list(season_df["Player"]), position_constants))
+
+        return name_to_pos_constant
+
+    @timed_stage("row_access")
+    def get_box_score_columns(self, stats):
+        return PlayerBatch.from_table(stats)
+
+    def calculate_p_100_p_matrix(
+        self, columns, metrics, aggregation_level="game", coefficient_set=None
+    ):
+        # Rows are players, columns follow P100_METRICS
+        per_one_hundred_possessions_stats = self.calculate_p_100_p_stats(
+            columns,
+            metrics,
+            aggregation_level=aggregation_level,
+            coefficient_set=coefficient_set,
+        )
+        return np.column_stack(
+            [per_one_hundred_possessions_stats[metric] for metric in self.P100_METRICS]
+        )
+
+    def get_coefficient_set(self, coefficient_set=None):
+        # CoefficientSet of a call (name or set), by default the calculator's
+        if coefficient_set is None:
+            coefficient_set = self.coefficient_set
+        return coefficient_sets.get(coefficient_set)
+
+    def get_bpm_tables(self, bpm_type="default", coefficient_set=None):
+        # Compiled (coefficients, position constants) arrays for a bpm type
+        if bpm_type != "offense":
+            bpm_type = "default"
+        return self.get_coefficient_set(coefficient_set).get_bpm_tables(bpm_type)
+
+    def calculate_roster_position_adjustment(
+        self, position, offensive_role, bpm_types=BPM_TYPES, coefficient_set=None
+    ):
+        # One row per bpm type, one column per player. Constants of a mixed
+        # set batch already have one row per player.
+        position_constants = np.moveaxis(
+            [self.get_bpm_tables(t, coefficient_set)[1] for t in bpm_types], -1, 0
+        )
+        if position_constants.ndim == 2:
+            position_constants = position_constants[:, :, None]
+        pos_1, pos_3, pos_5, slope = position_constants
+
+        pre_slope_adjustment = np.where(
+            position < 3,
+            (position - 1) / 2 * pos_3 + (3 - position) / 2 * pos_1,
+            (position - 3) / 2 * pos_5 + (5 - position) / 2 * pos_3,
+        )
+        return pre_slope_adjustment + slope * (offensive_role - 3)
+
+    def calculate_roster_raw_bpms(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        bpm_types=BPM_TYPES,
+        aggregation_level="game",
+        coefficient_set=None,
+    ):
+        # Raw BPM for several coefficient sets at once, shape (types, players).
+        # The p100 matrix is built once and dotted against every set.
+        coefficients = np.array(
+            [self.get_bpm_tables(t, coefficient_set)[0] for t in bpm_types]
+        )
+        pos_1_coef = coefficients[..., 0, :]
+        pos_5_coef = coefficients[..., 1, :]
+        if coefficients.ndim == 3:
+            # Shared by every player
+            pos_1_coef = pos_1_coef[:, None, :]
+            pos_5_coef = pos_5_coef[:, None, :]
+
+        p100_matrix = self.calculate_p_100_p_matrix(
+            columns,
+            metrics,
+            aggregation_level=aggregation_level,
+            coefficient_set=coefficient_set,
+        )
+
+        # FGA/FTA interpolate on offensive role, everything else on position.
+        # Interpolation is linear, so weight the p100 stats instead of the
+        # coefficients. Summing each player's row explicitly (not a matmul)
+        # keeps the rounding independent of how many rows are scored at once.
+        weight = np.where(
+            self.IS_ROLE_METRIC, offensive_role[:, None], position[:, None]
+        )
+        pos_1_weighted = (5 - weight) / 4 * p100_matrix
+        pos_5_weighted = (weight - 1) / 4 * p100_matrix
+
+        position_adjustment = self.calculate_roster_position_adjustment(
+            position, offensive_role, bpm_types, coefficient_set
+        )
+        return (pos_1_weighted * pos_1_coef + pos_5_weighted * pos_5_coef).sum(
+            axis=-1
+        ) + position_adjustment
+
+    def calculate_roster_raw_bpm(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        bpm_type="default",
+        aggregation_level="game",
+        coefficient_set=None,
+    ):
+        return self.calculate_roster_raw_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            bpm_types=(bpm_type,),
+            aggregation_level=aggregation_level,
+            coefficient_set=coefficient_set,
+        )[0]
+
+    def calculate_roster_bpms(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        general_game,
+        bpm_types=BPM_TYPES,
+        aggregation_level="game",
+        segments=None,
+        schedule=None,
+        coefficient_set=None,
+    ):
+        # metrics / general_game values are scalars for a single team or
+        # row aligned arrays when rows from several teams are stacked. With
+        # segments, a schedule table (general_game fields and Pace, one row
+        # per segment) computes team adjustments once per team-game instead
+        # of once per row.
+        raw_bpms = self.calculate_roster_raw_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            bpm_types=bpm_types,
+            aggregation_level=aggregation_level,
+            coefficient_set=coefficient_set,
+        )
+        percent_min = columns["MP"] / (metrics["Mins"] / 5)
+
+        if schedule is not None:
+            schedule = as_column_table(schedule)
+            team_adjustment_objs = [
+                self.gather_segment_values(
+                    self.calculate_team_adjustment(
+                        schedule,
+                        self.segment_totals(
+                            percent_min * raw_bpm, segments, len(schedule["Pace"])
+                        ),
+                        bpm_type=bpm_type,
+                        aggregation_level=aggregation_level,
+                        pace=np.asarray(schedule["Pace"], dtype=float),
+                    ),
+                    segments,
+                )
+                for bpm_type, raw_bpm in zip(bpm_types, raw_bpms)
+            ]
+        else:
+            team_adjustment_objs = [
+                self.calculate_team_adjustment(
+                    general_game,
+                    self.segment_sum(percent_min * raw_bpm, segments),
+                    bpm_type=bpm_type,
+                    aggregation_level=aggregation_level,
+                    pace=metrics["Pace"],
+                )
+                for bpm_type, raw_bpm in zip(bpm_types, raw_bpms)
+            ]
+        final_bpms = np.array(
+            [
+                raw_bpm + team_adjustment_obj["team_adjustment"]
+                for raw_bpm, team_adjustment_obj in zip(raw_bpms, team_adjustment_objs)
+            ]
+        )
+
+        return final_bpms, percent_min, team_adjustment_objs
+
+    def calculate_roster_bpm(
+        self,
+        columns,
+        position,
+        offensive_role,
+        metrics,
+        general_game,
+        bpm_type="default",
+        aggregation_level="game",
+        segments=None,
+        coefficient_set=None,
+    ):
+        final_bpms, percent_min, team_adjustment_objs = self.calculate_roster_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            general_game,
+            bpm_types=(bpm_type,),
+            aggregation_level=aggregation_level,
+            segments=segments,
+            coefficient_set=coefficient_set,
+        )
+        return final_bpms[0], percent_min, team_adjustment_objs[0]
+
+    def calculate_net(self, bpm, percent_min, adjustment_obj, general_game, metrics):
+        team_a_lead_bonus = self.calculate_lead_bonus(general_game)
+
+        return (
+            (
+                bpm
+                - (team_a_lead_bonus / 5)
+                - (
+                    (
+                        adjustment_obj["Rating_Total_A"]
+                        + adjustment_obj["Rating_Total_B"]
+                    )
+                    / 2
+                )
+                / 5
+            )
+            * percent_min
+            * (metrics["Pace"] / 100)
+            * (metrics["Mins"] / 5 / 40)
+        )
+
+
+class BpmCalculator(BpmKernel):
+    def __init__(
+        self,
+        season_df,
+        game_df,
+        season_team_metrics,
+        game_team_metrics,
+        recenter_passes=BpmKernel.RECENTER_PASSES,
+        season_context=None,
+        coefficient_set=None,
+        league_context=None,
+    ):
+        season_df = as_column_table(season_df)
+        game_df = as_column_table(game_df)
+        self.season_df = season_df  # Table containing season level data
+        self.game_df = game_df  # Table containing game level data
+        self.season_team_metrics = season_team_metrics  # Seasonal team metrics
+        self.game_team_metrics = game_team_metrics  # Game-specific team metrics
+        super().__init__(recenter_passes, coefficient_set, league_context)
+
+        # Season Level Coefficients, used to calculate per game BPM. Pass a
+        # precomputed season_context to skip re-estimating them per game.
+        if season_context is None:
+            season_context = self.calculate_season_context(
+                season_df, season_team_metrics
+            )
+        else:
+            self.check_season_context(season_context, season_df)
+        self.season_context = season_context
+
+        # Arrays indexed by player id (row of season_df)
+        self.player_ids = season_context.player_ids
+        self.position = season_context.position
+        self.offensive_role = season_context.offensive_role
+
+    @cached_property
+    def season_id_rows(self):
+        # Player_ID -> season_df row
+        return {
+            player_id: row
+            for row, player_id in enumerate(
+                np.asarray(self.season_df["Player_ID"]).tolist()
+            )
+        }
+
+    def get_player_id(self, player):
+        # Season row of a box score row: by Player_ID when both tables have
+        # one, otherwise by a name no teammate shares
+        if "Player_ID" in player and "Player_ID" in self.season_df:
+            return self.season_id_rows[player["Player_ID"]]
+        name = player["Player"]
+        if name not in self.player_ids and name in self.season_context.players:
+            raise ValueError(
+                f"Players share the name {name!r}; add Player_ID columns to tell "
+                "them apart"
+            )
+        return self.player_ids[name]
+
+    @cached_property
+    def game_rows(self):
+        # Player id of every game_df row, matched on first game level use so
+        # season level stats don't need every game player in season_df
+        if self.game_df is None:
+            return None
+        return self.match_player_rows(self.season_df, self.game_df)
+
+    def calculate_season_context(self, season_df, season_team_metrics):
+        columns = self.get_box_score_columns(season_df)
+        position = self.estimate_position(
+            columns,
+            self.calculate_pos_num(season_df["Position_On_Court"]),
+            season_team_metrics,
+        )
+        offensive_role = self.estimate_offensive_role(columns, season_team_metrics)
+        position.setflags(write=False)
+        offensive_role.setflags(write=False)
+
+        players = tuple(season_df["Player"])
+        shared = set(np.asarray(players)[occurrence_index(players) > 0].tolist())
+        player_ids = {
+            player: player_id
+            for player_id, player in enumerate(players)
+            if player not in shared
+        }
+
+        return SeasonContext(
+            players=players,
+            player_ids=MappingProxyType(player_ids),
+            position=position,
+            offensive_role=offensive_role,
+            recenter_passes=self.recenter_passes,
+            coefficient_set=self.coefficient_set.name,
+        )
+
+    def check_season_context(self, season_context, season_df):
+        # A passed context must come from this season_df and estimate settings
+        if len(season_context.players) != len(season_df["Player"]):
+            raise ValueError(
+                f"season_context has {len(season_context.players)} players, "
+                f"season_df has {len(season_df['Player'])}"
+            )
+        if season_context.recenter_passes != self.recenter_passes:
+            raise ValueError(
+                f"season_context was estimated with {season_context.recenter_passes} "
+                f"recenter passes, calculator uses {self.recenter_passes}"
+            )
+        if season_context.coefficient_set != self.coefficient_set.name:
+            raise ValueError(
+                f"season_context was estimated with coefficient set "
+                f"{season_context.coefficient_set!r}, calculator uses "
+                f"{self.coefficient_set.name!r}"
+            )
+
+    def calculate_team_adjustment(
+        self,
+        general_game,
+        player_contribution_sum,
+        bpm_type="default",
+        aggregation_level="game",
+        pace=None,
+    ):
+        # Season pace of the calculator's team unless given
+        if pace is None:
+            pace = self.season_team_metrics["Pace"]
+        return super().calculate_team_adjustment(
+            general_game,
+            player_contribution_sum,
+            bpm_type=bpm_type,
+            aggregation_level=aggregation_level,
+            pace=pace,
+        )
+
+    def calculate_raw_bpm(self, player, bpm_type="default", aggregation_level="game"):
+        per_one_hundred_possessions_stats = None
+        if aggregation_level == "game":
+            per_one_hundred_possessions_stats = self.calculate_p_100_p_stats(
+                player, metrics=self.game_team_metrics
+            )
+        else:
+            per_one_hundred_possessions_stats = self.calculate_p_100_p_stats(
+                player, metrics=self.season_team_metrics, aggregation_level="season"
+            )
+        scoring = self.calculate_scoring(
+            player, per_one_hundred_possessions_stats, bpm_type
+        )
+        ballhandling = self.calculate_ballhandling(
+            player, per_one_hundred_possessions_stats, bpm_type
+        )
+        rebounding = self.calculate_rebounding(
+            player, per_one_hundred_possessions_stats, bpm_type
+        )
+        defense = self.calculate_defense(
+            player, per_one_hundred_possessions_stats, bpm_type
+        )
+        position_adjustment = self.calculate_position_adjustment(player, bpm_type)
+        return scoring + ballhandling + rebounding + defense + position_adjustment
+
+    def calculate_scoring(
+        self, player, per_one_hundred_possessions_stats, bpm_type="default"
+    ):
+        # Define the metrics for scoring
+        metrics_bpm = ["Adj_Pt", "FGA", "FTA", "3FG_Bonus"]
+        p100_metrics = ["Adj_Pt", "FGA", "FTA", "3FG"]
+
+        # Compute the BPM values and p100p values
+        bpm_values = [
+            self.calculate_bpm_value(player, metric, bpm_type) for metric in metrics_bpm
+        ]
+
+        p100p_values = [
+            per_one_hundred_possessions_stats[metric] for metric in p100_metrics
+        ]
+
+        return np.dot(bpm_values, p100p_values)
+
     def calculate_ballhandling(
         self, player, per_one_hundred_possessions_stats, bpm_type="default"
     ):
@@ -357,272 +1266,386 @@ class BpmCalculator:
 
         return np.dot(bpm_values, p100p_values)
 
-    def calculate_offensive_role(self, season_df, season_metrics):
-        # Initialize dictionary to store offensive role constants
-        trim_one, trim_two, trim_three = [], [], []
-
-        # Not efficient - revisit if this all takes too long
-        thresh_pts = [
-            self.calculate_thresh_pts(player, season_metrics)
-            for _, player in season_df.iterrows()
-        ]
-
-        player_thresh_pts = dict(zip(list(season_df["Player"]), thresh_pts))
-        total_thresh_pts = sum(thresh_pts)
-
-        for _, player in season_df.iterrows():
-            percent_min = player["MP"] / (season_metrics["Total Minutes"] / 5)
-            percent_of_ast = (player["AST"] / season_metrics["Team AST"]) / percent_min
-            precent_of_threshpts = (
-                (player_thresh_pts[player["Player"]]) / total_thresh_pts / percent_min
-            )
-
-            est_off_role_one = (
-                self.OFFENSIVE_ROLE_COEFFICIENTS["Intercept"]
-                + self.OFFENSIVE_ROLE_COEFFICIENTS["Perc_Of_AST"] * percent_of_ast
-                + self.OFFENSIVE_ROLE_COEFFICIENTS["Perc_OF_ThreshPts"]
-                * precent_of_threshpts
-            )
-
-            or_min_adj_one = (
-                est_off_role_one * player["MP"]
-                + self.OFFENSIVE_ROLE_COEFFICIENTS["Default_Pos"]
-                * self.OFFENSIVE_ROLE_COEFFICIENTS["Min_Wt"]
-            ) / (player["MP"] + self.OFFENSIVE_ROLE_COEFFICIENTS["Min_Wt"])
-
-            trim_one.append(max(min(or_min_adj_one, 5), 1))
-
-        or_tm_avg_1 = (
-            np.dot(trim_one, season_df["MP"]) / season_metrics["Total Minutes"]
-        )
-        trim_two = [
-            max(min(min_adj_1 - (or_tm_avg_1 - 3), 5), 1) for min_adj_1 in trim_one
-        ]
-        or_tm_avg_2 = (
-            np.dot(trim_two, season_df["MP"]) / season_metrics["Total Minutes"]
-        )
-        trim_three = [
-            max(min(min_adj_1 - (or_tm_avg_1 - 3) - (or_tm_avg_2 - 3), 5), 1)
-            for min_adj_1 in trim_one
-        ]
-        tm_avg_3 = np.dot(trim_three, season_df["MP"]) / season_metrics["Total Minutes"]
-
-        # Calculate final position constants for all players
-        position_constants = [
-            max(
-                min(
-                    min_adj_1 - (or_tm_avg_1 - 3) - (or_tm_avg_2 - 3) - (tm_avg_3 - 3),
-                    5,
-                ),
-                1,
-            )
-            for min_adj_1 in trim_one
-        ]
-
-        offensive_role_lookup = dict(zip(list(season_df["Player"]), position_constants))
-        return offensive_role_lookup
-
-    def calculate_position(self, season_df, season_metrics):
-        trim_one, trim_two, trim_three = [], [], []
-
-        for _, player in season_df.iterrows():
-            percent_min = player["MP"] / (season_metrics["Total Minutes"] / 5)
-            percent_of_trb = (player["TRB"] / season_metrics["Team TRB"]) / percent_min
-            percent_of_stl = (player["STL"] / season_metrics["Team STL"]) / percent_min
-            percent_of_pf = (player["PF"] / season_metrics["Team PF"]) / percent_min
-            percent_of_ast = (player["AST"] / season_metrics["Team AST"]) / percent_min
-            percent_of_blk = (player["BLK"] / season_metrics["Team BLK"]) / percent_min
-
-            est_pos_1 = self.POSITION_COEFFICIENTS["Intercept"] + np.dot(
-                [
-                    self.POSITION_COEFFICIENTS["Perc_Of_TRB"],
-                    self.POSITION_COEFFICIENTS["Perc_Of_STL"],
-                    self.POSITION_COEFFICIENTS["Perc_Of_PF"],
-                    self.POSITION_COEFFICIENTS["Perc_Of_AST"],
-                    self.POSITION_COEFFICIENTS["Perc_Of_BLK"],
-                ],
-                [
-                    percent_of_trb,
-                    percent_of_stl,
-                    percent_of_pf,
-                    percent_of_ast,
-                    percent_of_blk,
-                ],
-            )
-
-            if player["Position_On_Court"] in self.POS_NUM:
-                pos_num = self.POS_NUM[player["Position_On_Court"]]
-            else:
-                pos_num = 3
-
-            total_mp = player["MP"]
-
-            min_adj_1 = (
-                est_pos_1 * total_mp + pos_num * self.POSITION_COEFFICIENTS["Min_Wt"]
-            ) / (total_mp + self.POSITION_COEFFICIENTS["Min_Wt"])
-
-            trim_one.append(max(min(min_adj_1, 5), 1))
-
-        # Calculate tm_avg_1, tm_avg_2, and tm_avg_3 based on all players
-        tm_avg_1 = np.dot(trim_one, season_df["MP"]) / season_metrics["Total Minutes"]
-        trim_two = [
-            max(min(min_adj_1 - (tm_avg_1 - 3), 5), 1) for min_adj_1 in trim_one
-        ]
-        tm_avg_2 = np.dot(trim_two, season_df["MP"]) / season_metrics["Total Minutes"]
-        trim_three = [
-            max(min(min_adj_1 - (tm_avg_1 - 3) - (tm_avg_2 - 3), 5), 1)
-            for min_adj_1 in trim_one
-        ]
-        tm_avg_3 = np.dot(trim_three, season_df["MP"]) / season_metrics["Total Minutes"]
-
-        # Calculate final position constants for all players
-        position_constants = [
-            max(min(min_adj_1 - (tm_avg_1 - 3) - (tm_avg_2 - 3) - (tm_avg_3 - 3), 5), 1)
-            for min_adj_1 in trim_one
-        ]
-
-        name_to_pos_constant = dict(zip(list(season_df["Player"]), position_constants))
-
-        return name_to_pos_constant
-
     def calculate_position_adjustment(self, player, bpm_type="default"):
-        player_name = player["Player"]
-        position = self.position[player_name]
-        pre_slope_adjustment = np.nan
-
-        position_constants = self.BPM_POSITION_CONSTANTS.copy()
+        player_id = self.get_player_id(player)
+        position = self.position[player_id]
 
-        if bpm_type == "offense":
-            position_constants = self.OBPM_POSITION_CONSTANTS.copy()
+        _, position_constants = self.get_bpm_tables(bpm_type)
+        pos_1, pos_3, pos_5, offensive_role_slope = position_constants
 
         if position < 3:
-            pre_slope_adjustment = (position - 1) / 2 * position_constants["Pos_3"] + (
+            pre_slope_adjustment = (position - 1) / 2 * pos_3 + (
                 3 - position
-            ) / 2 * position_constants["Pos_1"]
+            ) / 2 * pos_1
         else:
-            pre_slope_adjustment = (position - 3) / 2 * position_constants["Pos_5"] + (
+            pre_slope_adjustment = (position - 3) / 2 * pos_5 + (
                 5 - position
-            ) / 2 * position_constants["Pos_3"]
+            ) / 2 * pos_3
 
         return pre_slope_adjustment + (
-            position_constants["Offensive_Role_Slope"]
-            * (self.offensive_role[player_name] - 3)
+            offensive_role_slope * (self.offensive_role[player_id] - 3)
         )
 
     def calculate_bpm_value(self, player, metric, bpm_type="default"):
-        player_name = player["Player"]
-        coefficients = self.BPM_COEFFICIENTS
-
-        if bpm_type == "offense":
-            coefficients = self.OBPM_COEFFICIENTS
+        player_id = self.get_player_id(player)
+        coefficients, _ = self.get_bpm_tables(bpm_type)
 
-        pos_1_coef = coefficients[f"Pos_1_{metric}"]
-        pos_5_coef = coefficients[f"Pos_5_{metric}"]
+        index = self.METRIC_INDEX[metric]
+        pos_1_coef = coefficients[0, index]
+        pos_5_coef = coefficients[1, index]
 
-        position = self.position[player_name]
-        offensive_role = self.offensive_role[player_name]
-
-        if metric == "FGA" or metric == "FTA":
-            return (5 - offensive_role) / 4 * pos_1_coef + (
-                offensive_role - 1
-            ) / 4 * pos_5_coef
-
-        return (5 - position) / 4 * pos_1_coef + (position - 1) / 4 * pos_5_coef
-
-    def calculate_bpm(self, general_game, bpm_type="default", aggregation_level="game"):
-        season_or_game_level_stats = self.game_df
-
-        if aggregation_level == "season":
-            total_mins = self.season_team_metrics["Mins"]
-            season_or_game_level_stats = self.season_df
+        # FGA/FTA interpolate on offensive role
+        if self.IS_ROLE_METRIC[index]:
+            weight = self.offensive_role[player_id]
         else:
-            total_mins = self.game_team_metrics["Mins"]
+            weight = self.position[player_id]
 
-        player_bpm = {}
-        player_perc_min = {}
+        return (5 - weight) / 4 * pos_1_coef + (weight - 1) / 4 * pos_5_coef
 
-        total_contribution = 0
-        for _, player in season_or_game_level_stats.iterrows():
-            raw_bpm = self.calculate_raw_bpm(
-                player, bpm_type=bpm_type, aggregation_level=aggregation_level
-            )
+    def get_stats_table(self, aggregation_level="game"):
+        if aggregation_level == "season":
+            return self.season_df
+        return self.game_df
 
-            percent_min = player["MP"] / (total_mins / 5)
+    def get_roster_inputs(self, aggregation_level="game"):
+        season_or_game_level_stats = self.get_stats_table(aggregation_level)
+        metrics = self.game_team_metrics
 
-            contribution = percent_min * raw_bpm
-            total_contribution += contribution
+        if aggregation_level == "season":
+            metrics = self.season_team_metrics
+
+        players = list(season_or_game_level_stats["Player"])
+        position = self.position
+        offensive_role = self.offensive_role
+        if aggregation_level != "season":
+            position = position[self.game_rows]
+            offensive_role = offensive_role[self.game_rows]
+        columns = self.get_box_score_columns(season_or_game_level_stats)
+
+        return players, columns, position, offensive_role, metrics
+
+    def get_result_keys(self, aggregation_level="game"):
+        # Keys of dict results: Player_ID when the stats rows carry one,
+        # otherwise the name, which must then be unique
+        stats_table = self.get_stats_table(aggregation_level)
+        if "Player_ID" in stats_table:
+            return np.asarray(stats_table["Player_ID"]).tolist()
+        check_unique_names(stats_table["Player"])
+        return list(stats_table["Player"])
+
+    def get_result_columns(self, players, aggregation_level, key_columns, stats):
+        stats_table = self.get_stats_table(aggregation_level)
+        return {
+            **{key: np.asarray(stats_table[key]) for key in key_columns},
+            "Player": np.asarray(players),
+            **stats,
+        }
 
-            player_bpm[player["Player"]] = raw_bpm
-            player_perc_min[player["Player"]] = percent_min
+    def calculate_bpm(
+        self,
+        general_game,
+        bpm_type="default",
+        aggregation_level="game",
+        output="dict",
+        key_columns=(),
+    ):
+        players, columns, position, offensive_role, metrics = self.get_roster_inputs(
+            aggregation_level
+        )
 
-        team_adjustment_obj = self.calculate_team_adjustment(
+        final_bpm, percent_min, team_adjustment_obj = self.calculate_roster_bpm(
+            columns,
+            position,
+            offensive_role,
+            metrics,
             general_game,
-            total_contribution,
             bpm_type=bpm_type,
             aggregation_level=aggregation_level,
         )
-        team_adjustment = team_adjustment_obj["team_adjustment"]
 
-        final_bpm = {key: value + team_adjustment for key, value in player_bpm.items()}
+        if output != "dict":
+            # Columnar "box" aligned with the input rows, percent minutes
+            # included as a column instead of a separate lookup
+            box = self.get_result_columns(
+                players,
+                aggregation_level,
+                key_columns,
+                {"BPM": final_bpm, "Percent_Min": percent_min},
+            )
+            return {
+                "box": build_result_table(box, output),
+                "team_adjustment_obj": team_adjustment_obj,
+            }
 
+        players = self.get_result_keys(aggregation_level)
         return {
-            "box": final_bpm,
+            "box": dict(zip(players, final_bpm)),
             "team_adjustment_obj": team_adjustment_obj,
-            "percent_min_lookup": player_perc_min,
+            "percent_min_lookup": dict(zip(players, percent_min)),
         }
 
-    def calculate_all_stats(self, general_game, aggregation_level="game"):
-        bpm_res = self.calculate_bpm(general_game, aggregation_level=aggregation_level)
+    def calculate_all_stats(
+        self, general_game, aggregation_level="game", output="dict", key_columns=()
+    ):
+        players, columns, position, offensive_role, metrics = self.get_roster_inputs(
+            aggregation_level
+        )
+
+        # BPM and OBPM share one p100 matrix and one traversal of the roster
+        (bpms, obpms), percent_min, (adjustment_obj, _) = self.calculate_roster_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            general_game,
+            aggregation_level=aggregation_level,
+        )
+        dbpms = bpms - obpms
 
-        bpms = bpm_res["box"]
-        adjustment_obj = bpm_res["team_adjustment_obj"]
-        perc_min_lookup = bpm_res["percent_min_lookup"]
-        obpms = self.calculate_bpm(
-            general_game, bpm_type="offense", aggregation_level=aggregation_level
-        )["box"]
+        if aggregation_level == "game":
+            last_stat = "NET"
+            last_values = self.calculate_net(
+                bpms, percent_min, adjustment_obj, general_game, metrics
+            )
+        else:
+            last_stat = "CONTRIB"
+            last_values = percent_min * bpms
+
+        if output != "dict":
+            stats = {"BPM": bpms, "OBPM": obpms, "DBPM": dbpms, last_stat: last_values}
+            return build_result_table(
+                self.get_result_columns(players, aggregation_level, key_columns, stats),
+                output,
+            )
 
         combined = {}
+        for player, bpm, obpm, dbpm, last_value in zip(
+            self.get_result_keys(aggregation_level), bpms, obpms, dbpms, last_values
+        ):
+            combined[player] = {
+                "BPM": bpm,
+                "OBPM": obpm,
+                "DBPM": dbpm,
+                last_stat: last_value,
+            }
 
-        if aggregation_level == "game":
-            team_a_lead_bonus = self.calculate_lead_bonus(general_game)
+        return combined
 
-            net = {}
 
-            for player, bpm in bpms.items():
-                net_adjustment = (
-                    (
-                        bpm
-                        - (team_a_lead_bonus / 5)
-                        - (
-                            (
-                                adjustment_obj["Rating_Total_A"]
-                                + adjustment_obj["Rating_Total_B"]
-                            )
-                            / 2
-                        )
-                        / 5
-                    )
-                    * perc_min_lookup[player]
-                    * (self.game_team_metrics["Pace"] / 100)
-                    * (self.game_team_metrics["Mins"] / 5 / 40)
+# Compiled order of the position / offensive role regression coefficients
+POSITION_COEFFICIENT_NAMES = tuple(BpmCalculator.POSITION_COEFFICIENTS)
+OFFENSIVE_ROLE_COEFFICIENT_NAMES = tuple(BpmCalculator.OFFENSIVE_ROLE_COEFFICIENTS)
+POSITION_CONSTANT_NAMES = ("Pos_1", "Pos_3", "Pos_5", "Offensive_Role_Slope")
+
+
+@dataclass(frozen=True)
+class CoefficientSet:
+    # Read-only coefficient tables of one era / league, compiled once by
+    # compile_coefficient_set
+    name: object
+    bpm_types: tuple
+    coefficients: np.ndarray  # (bpm types, [Pos_1, Pos_5], BPM_METRICS)
+    position_constants: np.ndarray  # (bpm types, POSITION_CONSTANT_NAMES)
+    position: np.ndarray  # POSITION_COEFFICIENT_NAMES
+    offensive_role: np.ndarray  # OFFENSIVE_ROLE_COEFFICIENT_NAMES
+    tsa_coef: np.ndarray  # FTA weight of true shooting attempts
+
+    def get_bpm_tables(self, bpm_type="default"):
+        # (coefficients, position constants) of a bpm type
+        index = self.bpm_types.index(bpm_type)
+        return (
+            self.coefficients[..., index, :, :],
+            self.position_constants[..., index, :],
+        )
+
+    def position_coefficient(self, name):
+        return self.position[..., POSITION_COEFFICIENT_NAMES.index(name)]
+
+    def offensive_role_coefficient(self, name):
+        return self.offensive_role[..., OFFENSIVE_ROLE_COEFFICIENT_NAMES.index(name)]
+
+
+def compile_named_values(values, names, table):
+    missing = [name for name in names if name not in values]
+    unknown = [name for name in values if name not in names]
+    if missing or unknown:
+        raise ValueError(f"{table}: missing {missing}, unknown {unknown}")
+
+    compiled = np.array([values[name] for name in names], dtype=float)
+    if not np.isfinite(compiled).all():
+        raise ValueError(f"{table}: coefficients must be finite")
+    return compiled
+
+
+def compile_coefficient_set(
+    name,
+    bpm_coefficients,
+    obpm_coefficients,
+    bpm_position_constants,
+    obpm_position_constants,
+    position_coefficients,
+    offensive_role_coefficients,
+):
+    # Validate coefficient dicts laid out like BpmCalculator's (every name,
+    # nothing else, finite values) and compile them into a CoefficientSet
+    coefficient_names = [
+        f"Pos_{pos}_{metric}" for pos in (1, 5) for metric in BpmCalculator.BPM_METRICS
+    ]
+    for table, coefficients in (
+        ("BPM coefficients", bpm_coefficients),
+        ("OBPM coefficients", obpm_coefficients),
+    ):
+        compile_named_values(coefficients, coefficient_names, table)
+    for table, position_constants in (
+        ("BPM position constants", bpm_position_constants),
+        ("OBPM position constants", obpm_position_constants),
+    ):
+        compile_named_values(position_constants, POSITION_CONSTANT_NAMES, table)
+    if bpm_coefficients["Pos_1_FGA"] == 0:
+        raise ValueError("BPM coefficients: Pos_1_FGA weights TSA, must not be 0")
+
+    arrays = {
+        "coefficients": np.array(
+            [
+                compile_coefficients(coefficients, BpmCalculator.BPM_METRICS)
+                for coefficients in (bpm_coefficients, obpm_coefficients)
+            ]
+        ),
+        "position_constants": np.array(
+            [
+                compile_position_constants(position_constants)
+                for position_constants in (
+                    bpm_position_constants,
+                    obpm_position_constants,
                 )
+            ]
+        ),
+        "position": compile_named_values(
+            position_coefficients, POSITION_COEFFICIENT_NAMES, "Position coefficients"
+        ),
+        "offensive_role": compile_named_values(
+            offensive_role_coefficients,
+            OFFENSIVE_ROLE_COEFFICIENT_NAMES,
+            "Offensive role coefficients",
+        ),
+        # FTA weight of true shooting attempts, read off the Pos_1 BPM
+        # FTA / FGA coefficients
+        "tsa_coef": np.array(
+            bpm_coefficients["Pos_1_FTA"] / bpm_coefficients["Pos_1_FGA"], dtype=float
+        ),
+    }
+    for array in arrays.values():
+        array.setflags(write=False)
+
+    return CoefficientSet(name=name, bpm_types=("default", "offense"), **arrays)
+
+
+@dataclass(frozen=True)
+class MixedCoefficientSet:
+    # Several CoefficientSets stacked along a leading set axis plus the set
+    # of every row. Accessors index the small stacked tables by set_ids as
+    # the kernels read them, so a batch mixing sets is scored in one pass
+    # without copying a whole set onto every row.
+    name: tuple
+    bpm_types: tuple
+    coefficients: np.ndarray  # (sets, bpm types, [Pos_1, Pos_5], BPM_METRICS)
+    position_constants: np.ndarray  # (sets, bpm types, POSITION_CONSTANT_NAMES)
+    position: np.ndarray  # (sets, POSITION_COEFFICIENT_NAMES)
+    offensive_role: np.ndarray  # (sets, OFFENSIVE_ROLE_COEFFICIENT_NAMES)
+    tsa_coefs: np.ndarray  # (sets,)
+    set_ids: np.ndarray = None  # Index into the set axis, one per row
+
+    def for_rows(self, set_ids):
+        # Same stacked tables for another batch of rows
+        return replace(self, set_ids=np.asarray(set_ids))
+
+    @property
+    def tsa_coef(self):
+        return self.tsa_coefs[self.set_ids]
+
+    def get_bpm_tables(self, bpm_type="default"):
+        index = self.bpm_types.index(bpm_type)
+        return (
+            self.coefficients[:, index][self.set_ids],
+            self.position_constants[:, index][self.set_ids],
+        )
 
-                net[player] = net_adjustment
+    def position_coefficient(self, name):
+        return self.position[:, POSITION_COEFFICIENT_NAMES.index(name)][self.set_ids]
 
-            for player in bpms.keys():
-                combined[player] = {
-                    "BPM": bpms[player],
-                    "OBPM": obpms[player],
-                    "DBPM": bpms[player] - obpms[player],
-                    "NET": net[player],
-                }
-        else:
-            for player in bpms.keys():
-                combined[player] = {
-                    "BPM": bpms[player],
-                    "OBPM": obpms[player],
-                    "DBPM": bpms[player] - obpms[player],
-                    "CONTRIB": perc_min_lookup[player] * bpms[player],
-                }
+    def offensive_role_coefficient(self, name):
+        index = OFFENSIVE_ROLE_COEFFICIENT_NAMES.index(name)
+        return self.offensive_role[:, index][self.set_ids]
 
-        return combined
+
+def stack_coefficient_sets(coefficient_sets):
+    # MixedCoefficientSet of several sets, built once per league; pick the
+    # rows with for_rows
+    arrays = {
+        field: np.stack(
+            [getattr(coefficient_set, field) for coefficient_set in coefficient_sets]
+        )
+        for field in (
+            "coefficients",
+            "position_constants",
+            "position",
+            "offensive_role",
+        )
+    }
+    arrays["tsa_coefs"] = np.array(
+        [coefficient_set.tsa_coef for coefficient_set in coefficient_sets]
+    )
+    for array in arrays.values():
+        array.setflags(write=False)
+
+    return MixedCoefficientSet(
+        name=tuple(coefficient_set.name for coefficient_set in coefficient_sets),
+        bpm_types=coefficient_sets[0].bpm_types,
+        **arrays,
+    )
+
+
+class CoefficientRegistry:
+    # Named CoefficientSets (eras, women's / non-D-I leagues). Sets are
+    # validated and compiled once on register; calculators look them up by
+    # name.
+
+    def __init__(self):
+        self.sets = {}
+
+    def register(self, name, replace=False, **tables):
+        # tables: the compile_coefficient_set keyword arguments. Registered
+        # names are only replaced on request.
+        if name in self.sets and not replace:
+            raise ValueError(
+                f"Coefficient set {name!r} is already registered, pass replace=True"
+            )
+        coefficient_set = compile_coefficient_set(name, **tables)
+        self.sets[name] = coefficient_set
+        return coefficient_set
+
+    def get(self, coefficient_set):
+        # Set of a registered name; CoefficientSets pass through
+        if isinstance(coefficient_set, (CoefficientSet, MixedCoefficientSet)):
+            return coefficient_set
+        if coefficient_set not in self.sets:
+            raise KeyError(f"Unknown coefficient set {coefficient_set!r}")
+        return self.sets[coefficient_set]
+
+    def __contains__(self, name):
+        return name in self.sets
+
+    def names(self):
+        return tuple(self.sets)
+
+
+coefficient_sets = CoefficientRegistry()
+coefficient_sets.register(
+    "default",
+    bpm_coefficients=BpmCalculator.BPM_COEFFICIENTS,
+    obpm_coefficients=BpmCalculator.OBPM_COEFFICIENTS,
+    bpm_position_constants=BpmCalculator.BPM_POSITION_CONSTANTS,
+    obpm_position_constants=BpmCalculator.OBPM_POSITION_CONSTANTS,
+    position_coefficients=BpmCalculator.POSITION_COEFFICIENTS,
+    offensive_role_coefficients=BpmCalculator.OFFENSIVE_ROLE_COEFFICIENTS,
+)
@@ -0,0 +1,217 @@
+import copy
+import dataclasses
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from .playerBpm import BpmCalculator, as_column_table, coefficient_sets
+except ImportError:
+    from playerBpm import BpmCalculator, as_column_table, coefficient_sets
+
+# Bumped whenever cached results would change for the same inputs
+CACHE_VERSION = 1
+
+# Input table columns that can change a result
+TABLE_COLUMNS = ("Player", "Player_ID", "Position_On_Court")
+
+
+def update_digest(digest, value):
+    # Feed a value into a hashlib digest. Numbers hash by float value (75 and
+    # 75.0 give the same key, as they give the same result); tables and
+    # dicts hash by sorted column / key name.
+    value = as_column_table(value)
+    if isinstance(value, dict) or hasattr(value, "columns"):
+        digest.update(b"{")
+        for key in sorted(value, key=str):
+            update_digest(digest, str(key))
+            update_digest(digest, value[key])
+        digest.update(b"}")
+    elif value is None:
+        digest.update(b"N")
+    elif isinstance(value, (str, bytes)):
+        data = value.encode() if isinstance(value, str) else value
+        digest.update(b"s%d:" % len(data) + data)
+    elif np.ndim(value) == 0:
+        digest.update(b"f" + repr(float(value)).encode())
+    else:
+        array = np.asarray(value)
+        if array.dtype.kind in "OSU":
+            digest.update(b"[")
+            for item in array.ravel():
+                update_digest(digest, str(item))
+            digest.update(b"]")
+        else:
+            array = np.ascontiguousarray(array, dtype=float)
+            digest.update(b"a" + repr(array.shape).encode() + array.tobytes())
+
+
+def calculate_cache_key(
+    calculator_class,
+    season_df,
+    game_df,
+    season_team_metrics,
+    game_team_metrics,
+    general_game,
+    recenter_passes=BpmCalculator.RECENTER_PASSES,
+    coefficient_set=None,
+    league_context=None,
+    **options,
+):
+    # Stable hash of everything a calculate_all_stats result depends on,
+    # coefficient tables and AVG_RATING included, so editing any of them
+    # invalidates earlier entries. The class is named in the key as
+    # subclasses may override kernels, not just constants.
+    if coefficient_set is None:
+        coefficient_set = calculator_class.COEFFICIENT_SET
+    coefficient_set = coefficient_sets.get(coefficient_set)
+
+    digest = hashlib.sha256()
+    table_columns = (
+        *TABLE_COLUMNS,
+        *calculator_class.BOX_SCORE_COLUMNS,
+        *options.get("key_columns", ()),
+    )
+    for table in (season_df, game_df):
+        table = as_column_table(table)
+        if table is not None:
+            table = {
+                column: table[column] for column in table_columns if column in table
+            }
+        update_digest(digest, table)
+
+    update_digest(
+        digest,
+        {
+            "version": CACHE_VERSION,
+            "calculator_class": (
+                f"{calculator_class.__module__}.{calculator_class.__qualname__}"
+            ),
+            "season_team_metrics": season_team_metrics,
+            "game_team_metrics": game_team_metrics,
+            "general_game": general_game,
+            "recenter_passes": recenter_passes,
+            "options": options,
+            "avg_rating": calculator_class.SEASON_STATS["AVG_RATING"],
+            "league_context": (
+                None if league_context is None else dataclasses.asdict(league_context)
+            ),
+            "tsa_coef": coefficient_set.tsa_coef,
+            "coefficients": coefficient_set.coefficients,
+            "position_constants": coefficient_set.position_constants,
+            "position_coefficients": coefficient_set.position,
+            "offensive_role_coefficients": coefficient_set.offensive_role,
+            "pos_num": calculator_class.POS_NUM,
+        },
+    )
+    return digest.hexdigest()
+
+
+class ResultCache:
+    # calculate_all_stats results keyed by content hash. At most max_entries
+    # stay in memory (least recently used evicted first); with a path,
+    # entries are also pickled there and survive restarts.
+
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()  # Key -> result, oldest first
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def get_entry_path(self, key):
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def get(self, key):
+        # Cached result or None
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if self.path is not None and os.path.exists(self.get_entry_path(key)):
+            with open(self.get_entry_path(key), "rb") as file:
+                result = pickle.load(file)
+            self.store(key, result)
+            return result
+
+        return None
+
+    def store(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def put(self, key, result):
+        self.store(key, result)
+        if self.path is not None:
+            # Renamed into place so readers never see a partial entry
+            temporary_path = f"{self.get_entry_path(key)}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self.get_entry_path(key))
+
+    def clear(self):
+        self.entries.clear()
+
+    def calculate_all_stats(
+        self,
+        season_df,
+        game_df,
+        season_team_metrics,
+        game_team_metrics,
+        general_game,
+        aggregation_level="game",
+        output="dict",
+        key_columns=(),
+        calculator_class=BpmCalculator,
+        recenter_passes=BpmCalculator.RECENTER_PASSES,
+        coefficient_set=None,
+        league_context=None,
+    ):
+        # Same result as calculator_class(...).calculate_all_stats(...); the
+        # calculator is only built on a miss. Callers get a copy, so
+        # mutating a result never changes the cached entry.
+        key = calculate_cache_key(
+            calculator_class,
+            season_df,
+            game_df,
+            season_team_metrics,
+            game_team_metrics,
+            general_game,
+            recenter_passes,
+            coefficient_set,
+            league_context,
+            aggregation_level=aggregation_level,
+            output=output,
+            key_columns=tuple(key_columns),
+        )
+
+        result = self.get(key)
+        if result is None:
+            self.misses += 1
+            calculator = calculator_class(
+                season_df,
+                game_df,
+                season_team_metrics,
+                game_team_metrics,
+                recenter_passes=recenter_passes,
+                coefficient_set=coefficient_set,
+                league_context=league_context,
+            )
+            result = calculator.calculate_all_stats(
+                general_game,
+                aggregation_level=aggregation_level,
+                output=output,
+                key_columns=key_columns,
+            )
+            self.put(key, result)
+        else:
+            self.hits += 1
+
+        return copy.deepcopy(result)
@@ -0,0 +1,169 @@
+import numpy as np
+
+try:
+    from .playerBpm import BpmCalculator, as_column_table, check_unique_names
+except ImportError:
+    from playerBpm import BpmCalculator, as_column_table, check_unique_names
+
+
+class SeasonTracker:
+    # Running season totals per team, updated one box score at a time so an
+    # update only touches the roster of the team that played
+
+    # Season team metric -> player box score column summed from the game
+    TEAM_TOTAL_COLUMNS = {
+        "Team TRB": "TRB",
+        "Team STL": "STL",
+        "Team PF": "PF",
+        "Team AST": "AST",
+        "Team BLK": "BLK",
+    }
+
+    # Season team metric -> game team metric
+    TEAM_GAME_COLUMNS = {
+        "Team Pts": "Pts",
+        "Team FGA": "FGA",
+        "Team FTA": "FTA",
+    }
+
+    def __init__(
+        self,
+        recenter_passes=BpmCalculator.RECENTER_PASSES,
+        league_context=None,
+        coefficient_set=None,
+    ):
+        self.recenter_passes = recenter_passes
+        self.league_context = league_context  # Shared LeagueContext, if any
+        self.coefficient_set = coefficient_set  # Registered set, or the default
+        self.season_dfs = {}  # Team -> dict of season total columns
+        self.season_team_metrics = {}  # Team -> season team metrics
+        self.season_contexts = {}  # Team -> latest SeasonContext
+        self.player_rows = {}  # Team -> {player key: row in season totals}
+
+    def get_player_keys(self, team, table):
+        # Player_ID for teams tracked by id, otherwise the name, which must
+        # be unique within the table
+        if "Player_ID" in self.season_dfs[team]:
+            return np.asarray(table["Player_ID"]).tolist()
+        check_unique_names(table["Player"])
+        return np.asarray(table["Player"]).tolist()
+
+    def add_team(self, team, season_df, season_team_metrics):
+        # Seed a team with totals through its last scored game
+        season_df = as_column_table(season_df)
+        players = list(season_df["Player"])
+
+        season_totals = {
+            "Player": players,
+            "Position_On_Court": list(season_df["Position_On_Court"]),
+        }
+        if "Player_ID" in season_df:
+            season_totals["Player_ID"] = list(season_df["Player_ID"])
+        for column in BpmCalculator.BOX_SCORE_COLUMNS:
+            season_totals[column] = np.array(season_df[column], dtype=float)
+
+        self.season_dfs[team] = season_totals
+        self.season_team_metrics[team] = dict(season_team_metrics)
+        self.player_rows[team] = {
+            player_key: row
+            for row, player_key in enumerate(self.get_player_keys(team, season_df))
+        }
+
+    def add_players(self, team, player_keys, players, positions):
+        season_totals = self.season_dfs[team]
+        player_rows = self.player_rows[team]
+
+        for player_key, player, position in zip(player_keys, players, positions):
+            player_rows[player_key] = len(season_totals["Player"])
+            season_totals["Player"].append(player)
+            season_totals["Position_On_Court"].append(position)
+            if "Player_ID" in season_totals:
+                season_totals["Player_ID"].append(player_key)
+
+        for column in BpmCalculator.BOX_SCORE_COLUMNS:
+            season_totals[column] = np.concatenate(
+                [season_totals[column], np.zeros(len(players))]
+            )
+
+    def update_team_metrics(self, team, game_df, game_team_metrics):
+        metrics = self.season_team_metrics[team]
+        previous_minutes = metrics.get("Total Minutes", 0)
+        total_minutes = previous_minutes + game_team_metrics["Mins"]
+
+        # Season pace is the minute weighted average of game paces
+        metrics["Pace"] = (
+            metrics.get("Pace", 0) * previous_minutes
+            + game_team_metrics["Pace"] * game_team_metrics["Mins"]
+        ) / total_minutes
+        metrics["Total Minutes"] = total_minutes
+        metrics["Mins"] = total_minutes
+        metrics["Team Games"] = metrics.get("Team Games", 0) + 1
+        # Baseline Pts/TSA is a season constant: the league context's, else
+        # the seeded one, else the first game's
+        if self.league_context is None and "Baseline Pts/TSA" in game_team_metrics:
+            metrics.setdefault(
+                "Baseline Pts/TSA", game_team_metrics["Baseline Pts/TSA"]
+            )
+
+        for season_column, game_column in self.TEAM_GAME_COLUMNS.items():
+            metrics[season_column] = (
+                metrics.get(season_column, 0) + game_team_metrics[game_column]
+            )
+        metrics["Pts"] = metrics["Team Pts"]
+
+        for season_column, box_score_column in self.TEAM_TOTAL_COLUMNS.items():
+            metrics[season_column] = metrics.get(season_column, 0) + np.sum(
+                np.asarray(game_df[box_score_column], dtype=float)
+            )
+
+    def add_game(self, team, game_df, game_team_metrics, general_game):
+        # Add one game's player lines to the team's season totals and return
+        # the refreshed season level calculate_all_stats results
+        game_df = as_column_table(game_df)
+        if team not in self.season_dfs:
+            self.season_dfs[team] = {"Player": [], "Position_On_Court": []}
+            for column in BpmCalculator.BOX_SCORE_COLUMNS:
+                self.season_dfs[team][column] = np.zeros(0)
+            self.season_team_metrics[team] = {}
+            self.player_rows[team] = {}
+            if "Player_ID" in game_df:
+                self.season_dfs[team]["Player_ID"] = []
+
+        players = list(game_df["Player"])
+        if "Position_On_Court" in game_df:
+            positions = list(game_df["Position_On_Court"])
+        else:
+            positions = ["?"] * len(players)
+
+        player_keys = self.get_player_keys(team, game_df)
+        new_players = [
+            (player_key, player, position)
+            for player_key, player, position in zip(player_keys, players, positions)
+            if player_key not in self.player_rows[team]
+        ]
+        if new_players:
+            self.add_players(team, *zip(*new_players))
+
+        rows = np.array(
+            [self.player_rows[team][player_key] for player_key in player_keys], int
+        )
+        season_totals = self.season_dfs[team]
+        for column in BpmCalculator.BOX_SCORE_COLUMNS:
+            np.add.at(
+                season_totals[column], rows, np.asarray(game_df[column], dtype=float)
+            )
+
+        self.update_team_metrics(team, game_df, game_team_metrics)
+
+        calculator = BpmCalculator(
+            season_totals,
+            None,
+            self.season_team_metrics[team],
+            None,
+            recenter_passes=self.recenter_passes,
+            coefficient_set=self.coefficient_set,
+            league_context=self.league_context,
+        )
+        self.season_contexts[team] = calculator.season_context
+
+        return calculator.calculate_all_stats(general_game, aggregation_level="season")
@@ -0,0 +1,275 @@
+import warnings
+
+import numpy as np
+
+try:
+    from .playerBpm import (
+        BpmKernel,
+        as_column_table,
+        build_result_table,
+        match_rows,
+    )
+    from .seasonTracker import SeasonTracker
+except ImportError:
+    from playerBpm import (
+        BpmKernel,
+        as_column_table,
+        build_result_table,
+        match_rows,
+    )
+    from seasonTracker import SeasonTracker
+
+
+class SeasonTrajectoryCalculator(BpmKernel):
+    # Season level stats of one team as of every game of its ordered game
+    # log, over trailing windows of it, or over bootstrap resamples of its
+    # games. Player and team totals are weighted sums of the per game arrays
+    # (prefix sums, their differences, resample counts) and every snapshot
+    # is scored in one segmented pass (segments = snapshots).
+
+    def __init__(
+        self,
+        game_key="Game",
+        recenter_passes=BpmKernel.RECENTER_PASSES,
+        coefficient_set=None,
+        league_context=None,
+    ):
+        self.game_key = game_key
+        super().__init__(recenter_passes, coefficient_set, league_context)
+
+    def get_game_log(self, player_games, team_games):
+        # Dense per game arrays of a team's log, games in team_games order:
+        # box[column] is (games, players), team[metric] is (games,) in
+        # season metric naming so both can be summed over any game range
+        player_games = as_column_table(player_games)
+        team_games = as_column_table(team_games)
+
+        games = np.asarray(team_games[self.game_key])
+        game_rows = match_rows([games], [player_games[self.game_key]])
+
+        use_ids = "Player_ID" in player_games
+        player_keys = self.get_player_keys(
+            player_games, [player_games[self.game_key]], use_ids
+        )
+        player_index = {}
+        player_rows = np.array(
+            [
+                player_index.setdefault(key, len(player_index))
+                for key in zip(*player_keys)
+            ],
+            dtype=int,
+        )
+        first_rows = np.unique(player_rows, return_index=True)[1]
+
+        positions = np.full(len(first_rows), "?", dtype=object)
+        if "Position_On_Court" in player_games:
+            positions = np.asarray(player_games["Position_On_Court"])[first_rows]
+
+        box = {}
+        for column, values in self.get_box_score_columns(player_games).items():
+            box[column] = np.zeros((len(games), len(first_rows)))
+            np.add.at(box[column], (game_rows, player_rows), values)
+
+        mins = np.asarray(team_games["Mins"], dtype=float)
+        team = {
+            "Total Minutes": mins,
+            "Mins": mins,
+            "Pace Minutes": np.asarray(team_games["Pace"], dtype=float) * mins,
+            "Team Games": np.ones(len(games)),
+        }
+        for season_column, game_column in SeasonTracker.TEAM_GAME_COLUMNS.items():
+            team[season_column] = np.asarray(team_games[game_column], dtype=float)
+        for season_column, box_column in SeasonTracker.TEAM_TOTAL_COLUMNS.items():
+            team[season_column] = box[box_column].sum(axis=1)
+
+        return {
+            "games": games,
+            "players": np.asarray(player_games["Player"])[first_rows],
+            "pos_num": self.calculate_pos_num(positions),
+            "box": box,
+            "team": team,
+            # None when the league context supplies it
+            "baseline": (
+                np.asarray(team_games["Baseline Pts/TSA"], dtype=float)
+                if "Baseline Pts/TSA" in team_games
+                else None
+            ),
+            "general_game": {
+                column: np.asarray(team_games[column], dtype=float)
+                for column in self.GENERAL_GAME_COLUMNS
+            },
+        }
+
+    def calculate_snapshot_stats(self, game_log, box_totals, team_totals, last_games):
+        # Season level stats of every (snapshot, player) with minutes.
+        # Snapshot s holds totals through game last_games[s] and is rated
+        # with that game's general_game fields, as SeasonTracker.add_game
+        # would after it.
+        snapshots, players = np.nonzero(box_totals["MP"] > 0)
+        columns = {
+            column: totals[snapshots, players] for column, totals in box_totals.items()
+        }
+
+        snapshot_metrics = {
+            **team_totals,
+            "Pace": team_totals["Pace Minutes"] / team_totals["Mins"],
+        }
+        snapshot_metrics["Pts"] = snapshot_metrics["Team Pts"]
+        if game_log["baseline"] is not None:
+            snapshot_metrics["Baseline Pts/TSA"] = game_log["baseline"][last_games]
+        metrics = {
+            metric: np.asarray(values)[snapshots]
+            for metric, values in snapshot_metrics.items()
+        }
+        general_game = {
+            column: values[last_games][snapshots]
+            for column, values in game_log["general_game"].items()
+        }
+
+        position = self.estimate_position(
+            columns, game_log["pos_num"][players], metrics, segments=snapshots
+        )
+        offensive_role = self.estimate_offensive_role(
+            columns, metrics, segments=snapshots
+        )
+        (bpm, obpm), percent_min, _ = self.calculate_roster_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            general_game,
+            aggregation_level="season",
+            segments=snapshots,
+        )
+
+        return (
+            snapshots,
+            players,
+            {
+                "BPM": bpm,
+                "OBPM": obpm,
+                "DBPM": bpm - obpm,
+                "CONTRIB": percent_min * bpm,
+            },
+        )
+
+    def calculate_season_to_date(self, player_games, team_games, output="frame"):
+        # One row per (game, player seen so far): season stats through that
+        # game. player_games holds one team's box scores, team_games its
+        # ordered game log with game metrics and general_game fields.
+        game_log = self.get_game_log(player_games, team_games)
+        box_totals = {
+            column: np.cumsum(values, axis=0)
+            for column, values in game_log["box"].items()
+        }
+        team_totals = {
+            metric: np.cumsum(values) for metric, values in game_log["team"].items()
+        }
+
+        snapshots, players, stats = self.calculate_snapshot_stats(
+            game_log, box_totals, team_totals, np.arange(len(game_log["games"]))
+        )
+        return build_result_table(
+            {
+                self.game_key: game_log["games"][snapshots],
+                "Player": game_log["players"][players],
+                **stats,
+            },
+            output,
+        )
+
+    def get_window_sums(self, values, windows):
+        # Sums over the last `window` games ending at every game, one block
+        # of len(games) snapshots per window. Early games use what exists.
+        prefix = np.concatenate(
+            [np.zeros((1, *values.shape[1:])), np.cumsum(values, 0)]
+        )
+        ends = np.arange(1, len(values) + 1)
+        return np.concatenate(
+            [prefix[ends] - prefix[np.maximum(ends - window, 0)] for window in windows]
+        )
+
+    def calculate_rolling(
+        self, player_games, team_games, windows=(5, 10), output="frame"
+    ):
+        # One row per (window, game, player with minutes in the window):
+        # season style stats over the team's last `window` games through that
+        # game, position and offensive role re-estimated per window. All
+        # windows are scored in the same pass.
+        game_log = self.get_game_log(player_games, team_games)
+        games = len(game_log["games"])
+        box_totals = {
+            column: self.get_window_sums(values, windows)
+            for column, values in game_log["box"].items()
+        }
+        team_totals = {
+            metric: self.get_window_sums(values, windows)
+            for metric, values in game_log["team"].items()
+        }
+
+        snapshots, players, stats = self.calculate_snapshot_stats(
+            game_log, box_totals, team_totals, np.tile(np.arange(games), len(windows))
+        )
+        return build_result_table(
+            {
+                "Window": np.repeat(windows, games)[snapshots],
+                self.game_key: game_log["games"][snapshots % games],
+                "Player": game_log["players"][players],
+                **stats,
+            },
+            output,
+        )
+
+    def calculate_bootstrap(
+        self,
+        player_games,
+        team_games,
+        resamples=1000,
+        confidence=0.9,
+        seed=None,
+        output="frame",
+    ):
+        # Season stats of the whole log per player with percentile intervals
+        # over `resamples` draws of its games with replacement. Each resample
+        # is a row of game counts, so all totals are one matrix product and
+        # position / offensive role are re-estimated per resample in the
+        # same pass. Resamples are rated with the last game's general_game
+        # fields, like the last season to date snapshot.
+        game_log = self.get_game_log(player_games, team_games)
+        games = len(game_log["games"])
+        rng = np.random.default_rng(seed)
+        weights = np.vstack(
+            [
+                np.ones(games),
+                rng.multinomial(games, np.full(games, 1 / games), size=resamples),
+            ]
+        )
+
+        box_totals = {
+            column: weights @ values for column, values in game_log["box"].items()
+        }
+        team_totals = {
+            metric: weights @ values for metric, values in game_log["team"].items()
+        }
+        snapshots, players, stats = self.calculate_snapshot_stats(
+            game_log, box_totals, team_totals, np.full(len(weights), games - 1)
+        )
+
+        tail = (1 - confidence) / 2 * 100
+        columns = {"Player": game_log["players"]}
+        for stat in ("BPM", "OBPM", "DBPM"):
+            # Resample x player, NaN where the player has no minutes
+            values = np.full((len(weights), len(game_log["players"])), np.nan)
+            values[snapshots, players] = stats[stat]
+
+            # Players missing from every resample get NaN bounds
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low, high = np.nanpercentile(values[1:], [tail, 100 - tail], axis=0)
+
+            columns[stat] = values[0]
+            columns[f"{stat}_Low"] = low
+            columns[f"{stat}_High"] = high
+        columns["Resamples"] = np.count_nonzero(box_totals["MP"][1:] > 0, axis=0)
+
+        return build_result_table(columns, output)
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from collections.abc import Mapping
+from functools import wraps
+
+import numpy as np
+
+
+class StageMetrics:
+    # Wall time, call and row counts per calculation stage. Off by default;
+    # instrumented methods then only pay for one attribute check per call.
+
+    PROMETHEUS_FIELDS = (
+        ("seconds", "Wall time spent in the stage"),
+        ("calls", "Number of calls to the stage"),
+        ("rows", "Number of player rows produced by the stage"),
+    )
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stages = {}  # Stage -> {"calls": ..., "rows": ..., "seconds": ...}
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+
+    def record(self, stage, rows, seconds):
+        with self.lock:
+            totals = self.stages.setdefault(
+                stage, {"calls": 0, "rows": 0, "seconds": 0.0}
+            )
+            totals["calls"] += 1
+            totals["rows"] += rows
+            totals["seconds"] += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {stage: dict(totals) for stage, totals in self.stages.items()}
+
+    def to_prometheus(self, prefix="bpm_stage"):
+        stages = self.snapshot()
+        lines = []
+        for field, description in self.PROMETHEUS_FIELDS:
+            name = f"{prefix}_{field}_total"
+            lines.append(f"# HELP {name} {description}.")
+            lines.append(f"# TYPE {name} counter")
+            for stage in sorted(stages):
+                lines.append(f'{name}{{stage="{stage}"}} {stages[stage][field]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix="bpm_stage"):
+        # Written to a temporary file first so a collector never reads a
+        # half written file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(self.to_prometheus(prefix))
+        os.replace(temporary_path, path)
+
+
+# Shared by every calculator in the process. Process pool workers each
+# collect into their own copy.
+stage_metrics = StageMetrics()
+
+
+def count_rows(result):
+    # Player rows in a stage result: an array, or a mapping of row aligned
+    # values (the first one is counted)
+    if isinstance(result, Mapping):
+        result = next(iter(result.values()), ())
+    return int(np.size(result))
+
+
+def timed_stage(stage):
+    def decorator(method):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            if not stage_metrics.enabled:
+                return method(*args, **kwargs)
+
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            stage_metrics.record(stage, count_rows(result), time.perf_counter() - start)
+            return result
+
+        return timed
+
+    return decorator
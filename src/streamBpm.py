@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from .playerBpm import as_column_table, check_unique_names
+except ImportError:
+    from playerBpm import as_column_table, check_unique_names
+
+
+def find_group_starts(rows, key_columns):
+    # Index of the first row of every run of identical keys
+    changed = None
+    for key_column in key_columns:
+        keys = np.asarray(rows[key_column])
+        key_changed = keys[1:] != keys[:-1]
+        changed = key_changed if changed is None else changed | key_changed
+    return np.concatenate([[0], np.flatnonzero(changed) + 1]).astype(int)
+
+
+def stream_game_stats(path, league, team_games, chunksize=100_000, **read_csv_kwargs):
+    # Score a long player-game CSV chunk by chunk and lazily yield
+    # ((team, game), calculate_all_stats style dict) per team-game, in file
+    # order. Rows of a team-game must be contiguous in the file; the last
+    # (possibly incomplete) team-game of a chunk is carried into the next.
+    # Players are keyed by Player_ID when the file has one, otherwise by
+    # name, which must then be unique within each team-game.
+    key_columns = (league.team_key, league.game_key)
+    team_games = index_team_games(team_games, key_columns)
+    scored_keys = set()
+    pending = None
+
+    with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+
+            starts = find_group_starts(chunk, key_columns)
+            pending = chunk.iloc[starts[-1] :]
+
+            yield from score_game_groups(
+                chunk.iloc[: starts[-1]], starts[:-1], league, team_games, scored_keys
+            )
+
+    if pending is not None and len(pending):
+        yield from score_game_groups(
+            pending, np.array([0]), league, team_games, scored_keys
+        )
+
+
+def index_team_games(team_games, key_columns):
+    # Column arrays of team_games plus its row per (team, game) key, built
+    # once so every chunk only slices the team-games it scores
+    team_games = as_column_table(team_games)
+    columns = {column: np.asarray(team_games[column]) for column in team_games}
+    rows = {
+        key: row
+        for row, key in enumerate(
+            zip(*(columns[key_column].tolist() for key_column in key_columns))
+        )
+    }
+    return columns, rows
+
+
+def get_chunk_team_games(team_games, keys):
+    columns, rows = team_games
+    missing = [key for key in keys if key not in rows]
+    if missing:
+        raise KeyError(
+            f"{len(missing)} team-games have no team_games row, e.g. {missing[:5]}"
+        )
+    chunk_rows = np.array([rows[key] for key in keys], dtype=int)
+    return {column: values[chunk_rows] for column, values in columns.items()}
+
+
+def get_player_keys(rows, teams, games):
+    if "Player_ID" in rows:
+        return rows["Player_ID"].to_numpy()
+    players = rows["Player"].to_numpy()
+    check_unique_names(players, teams, games)
+    return players
+
+
+def score_game_groups(rows, starts, league, team_games, scored_keys):
+    if len(rows) == 0:
+        return
+
+    teams = rows[league.team_key].to_numpy()
+    games = rows[league.game_key].to_numpy()
+    keys = list(zip(teams[starts].tolist(), games[starts].tolist()))
+    for key in keys:
+        if key in scored_keys:
+            raise ValueError(f"Rows for team-game {key} are not contiguous")
+        scored_keys.add(key)
+    players = get_player_keys(rows, teams, games)
+
+    # One batch call for every complete team-game in the chunk
+    results = league.calculate_game_stats(
+        rows, get_chunk_team_games(team_games, keys), output="columns"
+    )
+    stats = {stat: results[stat] for stat in ("BPM", "OBPM", "DBPM", "NET")}
+
+    ends = np.append(starts[1:], len(rows))
+    for key, start, end in zip(keys, starts, ends):
+        yield key, {
+            players[row]: {stat: values[row] for stat, values in stats.items()}
+            for row in range(start, end)
+        }
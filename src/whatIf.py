@@ -0,0 +1,153 @@
+import numpy as np
+
+try:
+    from .playerBpm import PlayerBatch, build_result_table
+except ImportError:
+    from playerBpm import PlayerBatch, build_result_table
+
+
+class WhatIfEngine:
+    # Season level stats of a team under many box score perturbations at
+    # once. The base state (box score columns, position numbers, metrics and
+    # base stats) is computed once; every scenario is a segment of one
+    # batched pass, so re-centering and the team adjustment are redone per
+    # scenario without rebuilding a calculator.
+
+    # Season team metric -> player box score column it totals
+    TEAM_TOTAL_COLUMNS = {
+        "Total Minutes": "MP",
+        "Mins": "MP",
+        "Team Pts": "PTS",
+        "Pts": "PTS",
+        "Team FGA": "FGA",
+        "Team FTA": "FTA",
+        "Team TRB": "TRB",
+        "Team STL": "STL",
+        "Team PF": "PF",
+        "Team AST": "AST",
+        "Team BLK": "BLK",
+    }
+
+    # Columns recomputed from the changes to their parts
+    DERIVED_COLUMNS = ("TSA", "TRB")
+
+    def __init__(self, calculator, general_game):
+        # calculator: BpmCalculator of the team season, general_game: its
+        # season level general_game fields
+        self.calculator = calculator
+        self.general_game = general_game
+        self.players = np.asarray(calculator.season_context.players)
+
+        season_df = calculator.season_df
+        self.base_values = np.stack(
+            list(calculator.get_box_score_columns(season_df).values())
+        )
+        self.pos_num = calculator.calculate_pos_num(season_df["Position_On_Court"])
+        self.base_stats = calculator.calculate_all_stats(
+            general_game, aggregation_level="season", output="columns"
+        )
+
+    def get_scenario_values(self, scenarios):
+        # (scenarios, columns, players) box scores: base * scale + add. TSA
+        # and TRB follow the changes to FGA / FTA and ORB / DRB.
+        shape = (len(scenarios), *self.base_values.shape)
+        scale = np.ones(shape)
+        add = np.zeros(shape)
+        for scenario, changes in enumerate(scenarios):
+            for kind, factors in (("scale", scale), ("add", add)):
+                for player, columns in changes.get(kind, {}).items():
+                    player_id = self.get_player_id(player)
+                    for column, value in columns.items():
+                        if column in self.DERIVED_COLUMNS:
+                            raise ValueError(f"{column} follows from other columns")
+                        factors[scenario, self.column_index(column), player_id] = value
+
+        values = self.base_values * scale + add
+        delta = values - self.base_values
+        values[:, self.column_index("TSA")] += (
+            delta[:, self.column_index("FGA")]
+            + self.calculator.get_coefficient_set().tsa_coef
+            * delta[:, self.column_index("FTA")]
+        )
+        values[:, self.column_index("TRB")] += (
+            delta[:, self.column_index("ORB")] + delta[:, self.column_index("DRB")]
+        )
+        return values
+
+    def get_player_id(self, player):
+        # Season row of a scenario's player: by Player_ID when season_df has
+        # one, otherwise by a name no teammate shares
+        if "Player_ID" in self.calculator.season_df:
+            return self.calculator.season_id_rows[player]
+        return self.calculator.get_player_id({"Player": player})
+
+    def column_index(self, column):
+        return PlayerBatch.COLUMNS.index(column)
+
+    def scale_minutes(self, player, factor):
+        # Scenario giving a player `factor` times the minutes at the same
+        # per minute production
+        return {
+            "scale": {
+                player: {
+                    column: factor
+                    for column in PlayerBatch.COLUMNS
+                    if column not in self.DERIVED_COLUMNS
+                }
+            }
+        }
+
+    def evaluate(self, scenarios, output="frame"):
+        # scenarios: list of {"scale": {player: {column: factor}},
+        #                     "add": {player: {column: amount}}}
+        # on season totals, players given by Player_ID when season_df has
+        # one, otherwise by name. Team totals follow the changed player totals.
+        # Returns one row per (scenario, player).
+        values = self.get_scenario_values(scenarios)
+        players = len(self.players)
+        segments = np.repeat(np.arange(len(scenarios)), players)
+
+        columns = PlayerBatch(
+            {
+                column: values[:, index].ravel()
+                for index, column in enumerate(PlayerBatch.COLUMNS)
+            }
+        )
+        team_deltas = (values - self.base_values).sum(axis=-1)
+        metrics = {}
+        for metric, value in self.calculator.season_team_metrics.items():
+            scenario_metric = np.full(len(scenarios), value, dtype=float)
+            if metric in self.TEAM_TOTAL_COLUMNS:
+                column = self.TEAM_TOTAL_COLUMNS[metric]
+                scenario_metric += team_deltas[:, self.column_index(column)]
+            metrics[metric] = scenario_metric[segments]
+
+        calculator = self.calculator
+        position = calculator.estimate_position(
+            columns, np.tile(self.pos_num, len(scenarios)), metrics, segments=segments
+        )
+        offensive_role = calculator.estimate_offensive_role(
+            columns, metrics, segments=segments
+        )
+        (bpm, obpm), percent_min, _ = calculator.calculate_roster_bpms(
+            columns,
+            position,
+            offensive_role,
+            metrics,
+            self.general_game,
+            aggregation_level="season",
+            segments=segments,
+        )
+
+        return build_result_table(
+            {
+                "Scenario": segments,
+                "Player": np.tile(self.players, len(scenarios)),
+                "BPM": bpm,
+                "OBPM": obpm,
+                "DBPM": bpm - obpm,
+                "CONTRIB": percent_min * bpm,
+                "BPM_Change": bpm - np.tile(self.base_stats["BPM"], len(scenarios)),
+            },
+            output,
+        )
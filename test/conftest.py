@@ -0,0 +1,91 @@
+import pytest
+import pandas as pd
+
+
+@pytest.fixture
+def league_data():
+    season_df = pd.read_csv("data/texas_tech_bpm_test_data_season_level.csv")
+    season_df.rename({"Unnamed: 1": "Player"}, axis=1, inplace=True)
+    game_df = pd.read_csv("data/texas_tech_bpm_test_data_game_level.csv")
+    game_df.rename({"Starters": "Player"}, axis=1, inplace=True)
+
+    season_team_metrics = {
+        "Pace": 66,
+        "Team Pts": 2765,
+        "Pts": 2765,
+        "Team FGA": 2110,
+        "Team FTA": 694,
+        "Baseline Pts/TSA": 1.0,
+        "Total Minutes": 7652,
+        "Team TRB": 1209,
+        "Team STL": 278,
+        "Team PF": 663,
+        "Team AST": 518,
+        "Team BLK": 186,
+        "Mins": 7652,
+    }
+    game_team_metrics = {
+        "Pace": 71.3128,
+        "Mins": 200,
+        "Pts": 75,
+        "FGA": 57,
+        "FTA": 19,
+        "Baseline Pts/TSA": 1.0,
+    }
+    general_game_stats = {
+        "Team_A_Score": 75,
+        "Team_B_Score": 69,
+        "Team_A_Adj_OE": 115.9,
+        "Team_A_Adj_DE": 86.4,
+        "Team_B_Adj_OE": 124.4,
+        "Team_B_Adj_DE": 91,
+        "Team_A_OE": 105.17,
+        "Team_B_OE": 96.757,
+    }
+
+    # A second team with a different box score mix and its own metrics
+    other_season_df = season_df.copy()
+    other_season_df["AST"] = other_season_df["AST"][::-1].to_numpy()
+    other_season_df["Position_On_Court"] = "F"
+    other_game_df = game_df.copy()
+    other_game_df["TOV"] = other_game_df["TOV"] + 1
+
+    teams = {
+        "TTU": (
+            season_df,
+            game_df,
+            season_team_metrics,
+            game_team_metrics,
+            general_game_stats,
+        ),
+        "UVA": (
+            other_season_df,
+            other_game_df,
+            {**season_team_metrics, "Pace": 60, "Team AST": 530},
+            {**game_team_metrics, "Pace": 64.5},
+            {**general_game_stats, "Team_A_Score": 69, "Team_B_Score": 75},
+        ),
+    }
+
+    season_players = pd.concat(
+        [season.assign(Team=team) for team, (season, *_) in teams.items()],
+        ignore_index=True,
+    )
+    season_teams = pd.DataFrame(
+        [
+            {"Team": team, **season_metrics, **general_game}
+            for team, (_, _, season_metrics, _, general_game) in teams.items()
+        ]
+    )
+    player_games = pd.concat(
+        [game.assign(Team=team, Game=1) for team, (_, game, *_) in teams.items()],
+        ignore_index=True,
+    )
+    team_games = pd.DataFrame(
+        [
+            {"Team": team, "Game": 1, **game_metrics, **general_game}
+            for team, (_, _, _, game_metrics, general_game) in teams.items()
+        ]
+    )
+
+    return teams, season_players, season_teams, player_games, team_games
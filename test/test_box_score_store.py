@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import pandas as pd
+from playerBpm import BpmCalculator
+from leagueBpm import LeagueBpmCalculator
+from boxScoreStore import convert_box_score_csv, load_box_scores, write_box_scores
+
+
+def test_convert_and_load(league_data, tmp_path):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, game = teams["TTU"]
+
+    convert_box_score_csv(
+        "data/texas_tech_bpm_test_data_season_level.csv", tmp_path / "season"
+    )
+    convert_box_score_csv(
+        "data/texas_tech_bpm_test_data_game_level.csv", tmp_path / "game"
+    )
+    season_store = load_box_scores(tmp_path / "season")
+    game_store = load_box_scores(tmp_path / "game")
+
+    assert isinstance(season_store["MP"], np.memmap)
+    assert list(season_store["Player"]) == list(season_df["Player"])
+    assert list(season_store["Position_On_Court"]) == list(
+        season_df["Position_On_Court"]
+    )
+
+    expected = BpmCalculator(
+        season_df, game_df, season_metrics, game_metrics
+    ).calculate_all_stats(game)
+    results = BpmCalculator(
+        season_store, game_store, season_metrics, game_metrics
+    ).calculate_all_stats(game)
+
+    assert list(results) == list(expected)
+    for player, stats in expected.items():
+        assert results[player] == pytest.approx(stats)
+
+
+def test_load_league_tables(league_data, tmp_path):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    tables = {}
+    for name, table in (
+        ("season_players", season_players),
+        ("season_teams", season_teams),
+        ("player_games", player_games),
+        ("team_games", team_games),
+    ):
+        write_box_scores(table, tmp_path / name)
+        tables[name] = load_box_scores(tmp_path / name)
+
+    expected = LeagueBpmCalculator(season_players, season_teams).calculate_game_stats(
+        player_games, team_games
+    )
+    results = LeagueBpmCalculator(
+        tables["season_players"], tables["season_teams"]
+    ).calculate_game_stats(tables["player_games"], tables["team_games"])
+
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+def test_load_columns(tmp_path):
+    write_box_scores({"Player": ["a", "b"], "MP": [10, 20]}, tmp_path)
+
+    table = load_box_scores(tmp_path, columns=["MP"])
+    assert list(table) == ["MP"]
+    assert table["MP"].dtype == float
+
+    with pytest.raises(KeyError):
+        load_box_scores(tmp_path, columns=["PTS"])
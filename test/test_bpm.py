@@ -1,7 +1,18 @@
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import numpy as np
 import pandas as pd
-from playerBpm import BpmCalculator
+from playerBpm import (
+    BpmCalculator,
+    PlayerBatch,
+    build_result_table,
+    coefficient_sets,
+    compile_coefficient_set,
+    occurrence_index,
+)
 
 
 @pytest.fixture
@@ -472,3 +483,493 @@ def test_season_level_stats(mock_data):
     assert players["Parker Hicks"]["OBPM"] == pytest.approx(0.4, 0.1)
     assert players["Parker Hicks"]["DBPM"] == pytest.approx(1.6, 0.1)
     assert players["Parker Hicks"]["CONTRIB"] == pytest.approx(0.066, 0.1)
+
+
+def test_calculate_roster_raw_bpm(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        _,
+        game_team_metrics,
+        _,
+        game_df,
+        _,
+        _,
+    ) = mock_data
+
+    raw_bpms = bpm_calculator.calculate_roster_raw_bpm(
+        bpm_calculator.get_box_score_columns(game_df),
+        bpm_calculator.position[bpm_calculator.game_rows],
+        bpm_calculator.offensive_role[bpm_calculator.game_rows],
+        game_team_metrics,
+    )
+
+    for raw_bpm, (_, player) in zip(raw_bpms, game_df.iterrows()):
+        assert raw_bpm == pytest.approx(bpm_calculator.calculate_raw_bpm(player))
+
+
+def test_calculate_position_recenter_passes(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        _,
+        season_df,
+        _,
+        _,
+        _,
+    ) = mock_data
+
+    default_vals = bpm_calculator.calculate_position(season_df, season_team_metrics)
+    three_pass_vals = bpm_calculator.calculate_position(
+        season_df, season_team_metrics, passes=3
+    )
+    assert default_vals == three_pass_vals
+
+    # Extra passes only pull the minute weighted team average closer to 3
+    many_pass_vals = bpm_calculator.calculate_position(
+        season_df, season_team_metrics, passes=25
+    )
+    tm_avg = (
+        np.dot(list(many_pass_vals.values()), season_df["MP"])
+        / season_team_metrics["Total Minutes"]
+    )
+    assert tm_avg == pytest.approx(3, abs=0.01)
+
+
+def test_season_context_reuse(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    season_context = BpmCalculator(
+        season_df, None, season_team_metrics, None
+    ).season_context
+    assert season_context.recenter_passes == BpmCalculator.RECENTER_PASSES
+    assert season_context.coefficient_set == "default"
+
+    with pytest.raises(ValueError):
+        season_context.position[0] = 1
+    with pytest.raises(TypeError):
+        season_context.player_ids["Jarrett Culver"] = 1
+    with pytest.raises(AttributeError):
+        season_context.recenter_passes = 0
+
+    expected = bpm_calculator.calculate_all_stats(general_game_stats)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: BpmCalculator(
+                    season_df,
+                    game_df,
+                    season_team_metrics,
+                    game_team_metrics,
+                    season_context=season_context,
+                ).calculate_all_stats(general_game_stats),
+                range(8),
+            )
+        )
+
+    for result in results:
+        assert result == expected
+
+
+def test_season_context_mismatch(mock_data):
+    _, _, _, season_team_metrics, _, season_df, game_df, _, _ = mock_data
+
+    season_context = BpmCalculator(
+        season_df, None, season_team_metrics, None
+    ).season_context
+    with pytest.raises(ValueError, match="players"):
+        BpmCalculator(
+            season_df.iloc[1:],
+            None,
+            season_team_metrics,
+            None,
+            season_context=season_context,
+        )
+    with pytest.raises(ValueError, match="recenter passes"):
+        BpmCalculator(
+            season_df,
+            None,
+            season_team_metrics,
+            None,
+            recenter_passes=0,
+            season_context=season_context,
+        )
+    with pytest.raises(ValueError, match="coefficient set"):
+        BpmCalculator(
+            season_df,
+            None,
+            season_team_metrics,
+            None,
+            coefficient_set=compile_coefficient_set(
+                "previous",
+                **{
+                    argument: getattr(BpmCalculator, table)
+                    for table, argument in BpmCalculator.COEFFICIENT_TABLES.items()
+                },
+            ),
+            season_context=season_context,
+        )
+
+
+def test_calculate_roster_raw_bpms(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        _,
+        game_team_metrics,
+        _,
+        game_df,
+        _,
+        _,
+    ) = mock_data
+
+    players = list(game_df["Player"])
+    roster = (
+        bpm_calculator.get_box_score_columns(game_df),
+        bpm_calculator.position[bpm_calculator.game_rows],
+        bpm_calculator.offensive_role[bpm_calculator.game_rows],
+        game_team_metrics,
+    )
+
+    raw_bpms = bpm_calculator.calculate_roster_raw_bpms(*roster)
+    assert raw_bpms.shape == (2, len(players))
+    assert raw_bpms[0] == pytest.approx(
+        bpm_calculator.calculate_roster_raw_bpm(*roster)
+    )
+    assert raw_bpms[1] == pytest.approx(
+        bpm_calculator.calculate_roster_raw_bpm(*roster, bpm_type="offense")
+    )
+
+
+def test_compiled_coefficients():
+    for bpm_type, coefficients in (
+        ("default", BpmCalculator.BPM_COEFFICIENTS),
+        ("offense", BpmCalculator.OBPM_COEFFICIENTS),
+    ):
+        compiled, _ = coefficient_sets.get("default").get_bpm_tables(bpm_type)
+        assert compiled.shape == (2, len(BpmCalculator.BPM_METRICS))
+        assert not compiled.flags.writeable
+
+        for metric, index in BpmCalculator.METRIC_INDEX.items():
+            assert compiled[0, index] == coefficients[f"Pos_1_{metric}"]
+            assert compiled[1, index] == coefficients[f"Pos_5_{metric}"]
+
+    role_metrics = np.array(BpmCalculator.BPM_METRICS)[BpmCalculator.IS_ROLE_METRIC]
+    assert list(role_metrics) == ["FGA", "FTA"]
+
+
+def test_calculate_all_stats_columnar_output(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    expected = bpm_calculator.calculate_all_stats(general_game_stats)
+    bpm_calculator = BpmCalculator(
+        season_df,
+        game_df.assign(Team="TTU", Game=7),
+        season_team_metrics,
+        game_team_metrics,
+    )
+
+    frame = bpm_calculator.calculate_all_stats(
+        general_game_stats, output="frame", key_columns=("Team", "Game")
+    )
+    assert list(frame.columns) == [
+        "Team",
+        "Game",
+        "Player",
+        "BPM",
+        "OBPM",
+        "DBPM",
+        "NET",
+    ]
+    assert list(frame["Player"]) == list(game_df["Player"])
+    assert set(frame["Team"]) == {"TTU"}
+    for _, row in frame.iterrows():
+        assert row["NET"] == pytest.approx(expected[row["Player"]]["NET"])
+
+    records = bpm_calculator.calculate_all_stats(
+        general_game_stats, aggregation_level="season", output="records"
+    )
+    assert records.dtype.names == ("Player", "BPM", "OBPM", "DBPM", "CONTRIB")
+    assert records["Player"][0] == "Jarrett Culver"
+    assert records["BPM"][0] == pytest.approx(10.6, 0.1)
+
+    bpm_res = bpm_calculator.calculate_bpm(general_game_stats, output="columns")
+    assert bpm_res["box"]["BPM"] == pytest.approx(
+        list(bpm_calculator.calculate_bpm(general_game_stats)["box"].values())
+    )
+    assert "Percent_Min" in bpm_res["box"]
+
+    with pytest.raises(ValueError):
+        bpm_calculator.calculate_all_stats(general_game_stats, output="list")
+
+
+def test_occurrence_index():
+    players = ["a", "b", "a", "c", "a", "b"]
+    assert list(occurrence_index(players)) == [0, 0, 1, 0, 2, 1]
+    assert list(occurrence_index([1, 1, 2, 2, 2, 1], players)) == [0, 0, 0, 0, 1, 1]
+
+
+def test_duplicate_player_names(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    expected = bpm_calculator.calculate_all_stats(general_game_stats, output="frame")
+
+    # Names can't tell two teammates apart, e.g. when only the second plays
+    renamed = {"Matt Mooney": "Jarrett Culver"}
+    duplicate_calculator = BpmCalculator(
+        season_df.replace({"Player": renamed}),
+        game_df.replace({"Player": renamed}).iloc[1:],
+        season_team_metrics,
+        game_team_metrics,
+    )
+    for aggregation_level in ("game", "season"):
+        with pytest.raises(ValueError, match="Jarrett Culver"):
+            duplicate_calculator.calculate_all_stats(
+                general_game_stats, aggregation_level=aggregation_level
+            )
+    with pytest.raises(ValueError, match="Player_ID"):
+        duplicate_calculator.calculate_position_adjustment(
+            game_df.replace({"Player": renamed}).iloc[1]
+        )
+
+    # Player_ID columns take precedence over names
+    season_ids = season_df.assign(Player_ID=np.arange(len(season_df)) + 100)
+    game_ids = game_df.merge(season_ids[["Player", "Player_ID"]], on="Player")
+    id_calculator = BpmCalculator(
+        season_ids.replace({"Player": renamed}),
+        game_ids.replace({"Player": renamed}).iloc[::-1],
+        season_team_metrics,
+        game_team_metrics,
+    )
+    results = id_calculator.calculate_all_stats(general_game_stats, output="frame")
+    assert results["BPM"].to_numpy() == pytest.approx(expected["BPM"].to_numpy()[::-1])
+    assert id_calculator.calculate_position_adjustment(
+        game_ids.iloc[1]
+    ) == pytest.approx(bpm_calculator.calculate_position_adjustment(game_df.iloc[1]))
+
+    # and key dict results, one entry per row
+    results = id_calculator.calculate_all_stats(general_game_stats)
+    assert list(results) == list(game_ids["Player_ID"][::-1])
+    for player_id, bpm in zip(game_ids["Player_ID"], expected["BPM"]):
+        assert results[player_id]["BPM"] == pytest.approx(bpm)
+    box = id_calculator.calculate_bpm(general_game_stats, aggregation_level="season")
+    assert len(box["box"]) == len(box["percent_min_lookup"]) == len(season_ids)
+
+
+def test_game_player_missing_from_season(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    # Season level stats never match game rows
+    calculator = BpmCalculator(
+        season_df,
+        game_df.replace({"Player": {"Matt Mooney": "Walk On"}}),
+        season_team_metrics,
+        game_team_metrics,
+    )
+    assert calculator.calculate_all_stats(
+        general_game_stats, aggregation_level="season"
+    ) == bpm_calculator.calculate_all_stats(
+        general_game_stats, aggregation_level="season"
+    )
+
+    with pytest.raises(KeyError, match="Walk On"):
+        calculator.calculate_all_stats(general_game_stats)
+
+
+def test_pandas_free_core(mock_data, tmp_path):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    expected = bpm_calculator.calculate_all_stats(general_game_stats)
+
+    # Structured arrays in, column arrays out, in a fresh interpreter
+    for name, table in (("season", season_df), ("game", game_df)):
+        np.save(
+            tmp_path / f"{name}.npy",
+            build_result_table(
+                {column: table[column] for column in table.columns}, "records"
+            ),
+        )
+    script = f"""
+import json, sys
+import numpy as np
+import boxScoreStore, leagueBpm, parallelBpm, seasonTracker, stageMetrics
+from playerBpm import BpmCalculator
+calculator = BpmCalculator(
+    np.load({str(tmp_path / "season.npy")!r}),
+    np.load({str(tmp_path / "game.npy")!r}),
+    {season_team_metrics!r},
+    {game_team_metrics!r},
+)
+results = calculator.calculate_all_stats({general_game_stats!r}, output="columns")
+print(json.dumps({{
+    "pandas": "pandas" in sys.modules,
+    "Player": results["Player"].tolist(),
+    "BPM": results["BPM"].tolist(),
+    "NET": results["NET"].tolist(),
+}}))
+"""
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    results = json.loads(output.stdout)
+
+    assert not results["pandas"]
+    assert results["Player"] == list(expected)
+    assert results["BPM"] == pytest.approx(
+        [stats["BPM"] for stats in expected.values()]
+    )
+    assert results["NET"] == pytest.approx(
+        [stats["NET"] for stats in expected.values()]
+    )
+
+
+def test_calculate_team_adjustment_schedule(mock_data, league_data):
+    bpm_calculator = mock_data[0]
+    _, _, _, _, team_games = league_data
+
+    contributions = np.array([41.88, -12.5])
+    for aggregation_level in ("game", "season"):
+        for bpm_type in BpmCalculator.BPM_TYPES:
+            schedule_adjustment = bpm_calculator.calculate_team_adjustment(
+                team_games,
+                contributions,
+                bpm_type=bpm_type,
+                aggregation_level=aggregation_level,
+                pace=team_games["Pace"].to_numpy(),
+            )
+            for game, general_game in enumerate(team_games.to_dict("records")):
+                expected = bpm_calculator.calculate_team_adjustment(
+                    general_game,
+                    contributions[game],
+                    bpm_type=bpm_type,
+                    aggregation_level=aggregation_level,
+                    pace=general_game["Pace"],
+                )
+                for name, value in expected.items():
+                    assert schedule_adjustment[name][game] == pytest.approx(value)
+
+    lead_bonus = bpm_calculator.calculate_lead_bonus(team_games.to_records())
+    assert lead_bonus == pytest.approx([0.175 * 3, -0.175 * 3])
+
+
+def test_player_batch(mock_data):
+    bpm_calculator, _, _, _, game_team_metrics, _, game_df, _, _ = mock_data
+
+    batch = bpm_calculator.get_box_score_columns(game_df)
+    assert isinstance(batch, PlayerBatch)
+    assert batch.size == len(game_df)
+    assert list(batch) == list(BpmCalculator.BOX_SCORE_COLUMNS)
+    assert batch["3P"] == pytest.approx(game_df["3P"].to_numpy())
+
+    # Helpers score the whole batch at once, or one player through a view
+    batch_p100 = bpm_calculator.calculate_p_100_p_stats(batch, game_team_metrics)
+    for row, (_, player) in enumerate(game_df.iterrows()):
+        view = batch.player(row)
+        assert np.shares_memory(view["MP"], batch["MP"])
+
+        expected = bpm_calculator.calculate_p_100_p_stats(player, game_team_metrics)
+        view_p100 = bpm_calculator.calculate_p_100_p_stats(view, game_team_metrics)
+        for metric, value in expected.items():
+            assert batch_p100[metric][row] == pytest.approx(value)
+            assert view_p100[metric] == pytest.approx(value)
+
+    starters = batch.take([0, 1])
+    assert starters["PTS"] == pytest.approx(game_df["PTS"][:2].to_numpy())
+
+
+def test_subclass_coefficient_tables(mock_data):
+    (
+        bpm_calculator,
+        _,
+        _,
+        season_team_metrics,
+        game_team_metrics,
+        season_df,
+        game_df,
+        _,
+        general_game_stats,
+    ) = mock_data
+
+    class AssistCalculator(BpmCalculator):
+        BPM_COEFFICIENTS = {**BpmCalculator.BPM_COEFFICIENTS, "Pos_1_AST": 2.0}
+
+    tables = {
+        argument: getattr(AssistCalculator, table)
+        for table, argument in BpmCalculator.COEFFICIENT_TABLES.items()
+    }
+    expected = BpmCalculator(
+        season_df,
+        game_df,
+        season_team_metrics,
+        game_team_metrics,
+        coefficient_set=compile_coefficient_set("assist", **tables),
+    ).calculate_bpm(general_game_stats)["box"]
+    players = AssistCalculator(
+        season_df, game_df, season_team_metrics, game_team_metrics
+    ).calculate_bpm(general_game_stats)["box"]
+
+    assert players == expected
+    assert players["Jarrett Culver"] != pytest.approx(
+        bpm_calculator.calculate_bpm(general_game_stats)["box"]["Jarrett Culver"]
+    )
+    assert BpmCalculator.COEFFICIENT_SET == "default"
+
+    # Invalid tables fail when the subclass is defined
+    with pytest.raises(ValueError):
+
+        class MissingCalculator(BpmCalculator):
+            POSITION_COEFFICIENTS = {"Intercept": 2.13}
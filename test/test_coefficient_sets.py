@@ -0,0 +1,258 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from leagueBpm import LeagueBpmCalculator
+from parallelBpm import score_games_parallel
+from playerBpm import BpmCalculator, coefficient_sets, stack_coefficient_sets
+from seasonTracker import SeasonTracker
+
+DEFAULT_TABLES = {
+    "bpm_coefficients": BpmCalculator.BPM_COEFFICIENTS,
+    "obpm_coefficients": BpmCalculator.OBPM_COEFFICIENTS,
+    "bpm_position_constants": BpmCalculator.BPM_POSITION_CONSTANTS,
+    "obpm_position_constants": BpmCalculator.OBPM_POSITION_CONSTANTS,
+    "position_coefficients": BpmCalculator.POSITION_COEFFICIENTS,
+    "offensive_role_coefficients": BpmCalculator.OFFENSIVE_ROLE_COEFFICIENTS,
+}
+
+
+@pytest.fixture(autouse=True)
+def registered_sets():
+    # Sets a test registers don't outlive it
+    registered = dict(coefficient_sets.sets)
+    yield
+    coefficient_sets.sets.clear()
+    coefficient_sets.sets.update(registered)
+
+
+@pytest.fixture
+def alternate_set():
+    return coefficient_sets.register(
+        "test_alternate",
+        **{
+            **DEFAULT_TABLES,
+            "bpm_coefficients": {**BpmCalculator.BPM_COEFFICIENTS, "Pos_1_AST": 1.0},
+            "obpm_position_constants": {
+                **BpmCalculator.OBPM_POSITION_CONSTANTS,
+                "Pos_1": -1.0,
+            },
+            "position_coefficients": {
+                **BpmCalculator.POSITION_COEFFICIENTS,
+                "Intercept": 2.5,
+            },
+            "offensive_role_coefficients": {
+                **BpmCalculator.OFFENSIVE_ROLE_COEFFICIENTS,
+                "Intercept": 5.5,
+            },
+        },
+    )
+
+
+def test_register_validation():
+    with pytest.raises(ValueError):
+        coefficient_sets.register(
+            "test_missing",
+            **{
+                **DEFAULT_TABLES,
+                "position_coefficients": {
+                    name: value
+                    for name, value in BpmCalculator.POSITION_COEFFICIENTS.items()
+                    if name != "Min_Wt"
+                },
+            },
+        )
+    with pytest.raises(ValueError):
+        coefficient_sets.register(
+            "test_unknown",
+            **{
+                **DEFAULT_TABLES,
+                "bpm_position_constants": {
+                    **BpmCalculator.BPM_POSITION_CONSTANTS,
+                    "Pos_2": 0,
+                },
+            },
+        )
+    with pytest.raises(ValueError):
+        coefficient_sets.register(
+            "test_nan",
+            **{
+                **DEFAULT_TABLES,
+                "obpm_coefficients": {
+                    **BpmCalculator.OBPM_COEFFICIENTS,
+                    "Pos_5_BLK": math.nan,
+                },
+            },
+        )
+    assert "test_missing" not in coefficient_sets
+
+    # Registered names, "default" included, are only replaced on request
+    with pytest.raises(ValueError):
+        coefficient_sets.register("default", **DEFAULT_TABLES)
+    default = coefficient_sets.get("default")
+    replaced = coefficient_sets.register("test_replaced", **DEFAULT_TABLES)
+    with pytest.raises(ValueError):
+        coefficient_sets.register("test_replaced", **DEFAULT_TABLES)
+    assert coefficient_sets.get("test_replaced") is replaced
+    assert (
+        coefficient_sets.register("test_replaced", replace=True, **DEFAULT_TABLES)
+        is not replaced
+    )
+    assert coefficient_sets.get("default") is default
+
+    with pytest.raises(KeyError):
+        coefficient_sets.get("test_unregistered")
+
+
+def test_compiled_set(alternate_set):
+    assert coefficient_sets.get("test_alternate") is alternate_set
+    assert alternate_set.position_coefficient("Intercept") == 2.5
+    assert alternate_set.offensive_role_coefficient("Intercept") == 5.5
+    assert not alternate_set.coefficients.flags.writeable
+
+    coefficients, position_constants = alternate_set.get_bpm_tables("offense")
+    assert position_constants[0] == -1.0
+    assert coefficients[0, BpmCalculator.METRIC_INDEX["AST"]] == 0.476
+
+    stacked = stack_coefficient_sets((coefficient_sets.get("default"), alternate_set))
+    assert stacked.coefficients.shape == (2, *alternate_set.coefficients.shape)
+    mixed = stacked.for_rows([1, 0, 1])
+    assert list(mixed.position_coefficient("Intercept")) == [2.5, 2.13, 2.5]
+    assert list(mixed.tsa_coef) == [
+        alternate_set.tsa_coef,
+        alternate_set.tsa_coef,
+        alternate_set.tsa_coef,
+    ]
+    assert mixed.get_bpm_tables("default")[0].shape == (
+        3,
+        2,
+        len(BpmCalculator.BPM_METRICS),
+    )
+
+
+def test_calculator_coefficient_set(league_data, alternate_set):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+
+    default = BpmCalculator(season_df, game_df, season_metrics, game_metrics)
+    alternate = BpmCalculator(
+        season_df,
+        game_df,
+        season_metrics,
+        game_metrics,
+        coefficient_set="test_alternate",
+    )
+
+    class AlternateCalculator(BpmCalculator):
+        COEFFICIENT_SET = "test_alternate"
+
+    subclassed = AlternateCalculator(season_df, game_df, season_metrics, game_metrics)
+
+    assert not np.array_equal(default.position, alternate.position)
+    assert not np.array_equal(default.offensive_role, alternate.offensive_role)
+    assert subclassed.calculate_all_stats(
+        general_game
+    ) == alternate.calculate_all_stats(general_game)
+
+
+def test_mixed_league(league_data, alternate_set):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    mixed_teams = season_teams.assign(
+        Coefficients=np.where(
+            season_teams["Team"] == "UVA", "test_alternate", "default"
+        )
+    )
+    mixed = LeagueBpmCalculator(
+        season_players, mixed_teams, coefficient_set_key="Coefficients"
+    )
+    default = LeagueBpmCalculator(season_players, season_teams)
+    alternate = LeagueBpmCalculator(
+        season_players, season_teams, coefficient_set="test_alternate"
+    )
+
+    # Every team matches a league scored entirely with its own set
+    for method, args in (
+        ("calculate_season_stats", ()),
+        ("calculate_game_stats", (player_games, team_games)),
+    ):
+        results = getattr(mixed, method)(*args)
+        for team, league in (("TTU", default), ("UVA", alternate)):
+            expected = getattr(league, method)(*args)
+            pd.testing.assert_frame_equal(
+                results[results["Team"] == team],
+                expected[expected["Team"] == team],
+                check_exact=True,
+            )
+
+    pd.testing.assert_frame_equal(
+        score_games_parallel(
+            mixed, player_games, team_games, processes=2, shards_per_process=1
+        ),
+        mixed.calculate_game_stats(player_games, team_games),
+        check_exact=True,
+    )
+
+
+def test_coefficient_set_tsa_coef(league_data):
+    teams, season_players, season_teams, player_games, team_games = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+
+    shooting_set = coefficient_sets.register(
+        "test_shooting",
+        **{
+            **DEFAULT_TABLES,
+            "bpm_coefficients": {**BpmCalculator.BPM_COEFFICIENTS, "Pos_1_FTA": -0.4},
+        },
+    )
+    assert coefficient_sets.get("default").tsa_coef == pytest.approx(0.475, abs=1e-3)
+    assert shooting_set.tsa_coef == pytest.approx(0.714, abs=1e-3)
+
+    # TSA weighting follows the set everywhere it is read
+    default = BpmCalculator(season_df, game_df, season_metrics, game_metrics)
+    shooting = BpmCalculator(
+        season_df, game_df, season_metrics, game_metrics, coefficient_set=shooting_set
+    )
+    assert shooting.season_context.coefficient_set == "test_shooting"
+    assert shooting.calculate_pts_tsa(season_df.iloc[0]) != pytest.approx(
+        default.calculate_pts_tsa(season_df.iloc[0])
+    )
+    assert BpmCalculator.calculate_league_context(
+        season_teams, coefficient_set="test_shooting"
+    ) != BpmCalculator.calculate_league_context(season_teams)
+
+    # Mixed leagues weight TSA per row
+    mixed = LeagueBpmCalculator(
+        season_players,
+        season_teams.assign(
+            Coefficients=np.where(
+                season_teams["Team"] == "UVA", "test_shooting", "default"
+            )
+        ),
+        coefficient_set_key="Coefficients",
+    )
+    expected = LeagueBpmCalculator(
+        season_players, season_teams, coefficient_set="test_shooting"
+    )
+    for method, args in (
+        ("calculate_season_stats", ()),
+        ("calculate_game_stats", (player_games, team_games)),
+    ):
+        results = getattr(mixed, method)(*args)
+        expected_results = getattr(expected, method)(*args)
+        pd.testing.assert_frame_equal(
+            results[results["Team"] == "UVA"],
+            expected_results[expected_results["Team"] == "UVA"],
+            check_exact=True,
+        )
+
+
+def test_season_tracker_coefficient_set(league_data, alternate_set):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+
+    tracker = SeasonTracker(coefficient_set="test_alternate")
+    tracker.add_team("TTU", season_df, season_metrics)
+    tracker.add_game("TTU", game_df, game_metrics, general_game)
+    assert tracker.season_contexts["TTU"].coefficient_set == "test_alternate"
@@ -0,0 +1,109 @@
+import pytest
+import numpy as np
+from playerBpm import BpmCalculator, BpmKernel
+from leagueBpm import LeagueBpmCalculator, match_rows
+
+
+def test_match_rows():
+    rows = match_rows(
+        [["a", "a", "b"], [1, 2, 1]],
+        [["b", "a", "a", "b"], [1, 2, 1, 1]],
+    )
+    assert list(rows) == [2, 1, 0, 2]
+
+    with pytest.raises(KeyError, match=r"\('c', 3\)"):
+        match_rows([["a"], [1]], [["a", "c"], [1, 3]])
+
+    with pytest.raises(ValueError):
+        match_rows([["a", "a"]], [["a"]])
+
+
+def test_calculate_game_stats(league_data):
+    teams, season_players, season_teams, player_games, team_games = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    results = league.calculate_game_stats(player_games, team_games)
+
+    assert len(results) == len(player_games)
+    for team, (season_df, game_df, season_metrics, game_metrics, game) in teams.items():
+        expected = BpmCalculator(
+            season_df, game_df, season_metrics, game_metrics
+        ).calculate_all_stats(game)
+        team_results = results[results["Team"] == team]
+
+        assert list(team_results["Player"]) == list(expected)
+        for _, row in team_results.iterrows():
+            for stat in ("BPM", "OBPM", "DBPM", "NET"):
+                assert row[stat] == pytest.approx(expected[row["Player"]][stat])
+
+
+def test_calculate_season_stats(league_data):
+    teams, season_players, season_teams, _, _ = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    results = league.calculate_season_stats()
+
+    assert len(results) == len(season_players)
+    for team, (season_df, game_df, season_metrics, game_metrics, game) in teams.items():
+        calculator = BpmCalculator(season_df, game_df, season_metrics, game_metrics)
+        expected = calculator.calculate_all_stats(game, aggregation_level="season")
+        team_results = results[results["Team"] == team]
+
+        for _, row in team_results.iterrows():
+            for stat in ("BPM", "OBPM", "DBPM", "CONTRIB"):
+                assert row[stat] == pytest.approx(expected[row["Player"]][stat])
+
+        team_positions = league.position[np.asarray(season_players["Team"] == team)]
+        assert team_positions == pytest.approx(calculator.position)
+
+
+def test_league_shares_kernels_only(league_data):
+    _, season_players, season_teams, _, _ = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    assert isinstance(league, BpmKernel)
+    assert not isinstance(league, BpmCalculator)
+    # BpmCalculator's per team APIs read tables a league does not hold
+    assert not hasattr(league, "calculate_bpm")
+    assert not hasattr(league, "calculate_all_stats")
+
+
+def test_row_scorer(league_data):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    rows = league.get_game_rows(player_games, team_games)
+    scorer = LeagueBpmCalculator.row_scorer(league.recenter_passes)
+
+    # Matched rows score the same without the season tables
+    assert not hasattr(scorer, "season_players")
+    expected = league.calculate_game_row_stats(*rows)
+    for stat, values in scorer.calculate_game_row_stats(*rows).items():
+        assert values == pytest.approx(expected[stat])
+
+
+def test_league_player_keys(league_data):
+    _, season_players, season_teams, player_games, team_games = league_data
+    renamed = {"Player": {"Matt Mooney": "Jarrett Culver"}}
+
+    # Only the second of two same-named teammates plays: names are ambiguous
+    with pytest.raises(ValueError, match="Jarrett Culver"):
+        LeagueBpmCalculator(
+            season_players.replace(renamed), season_teams
+        ).calculate_game_stats(
+            player_games[player_games["Player"] != "Jarrett Culver"].replace(renamed),
+            team_games,
+        )
+
+    # Player_ID tells them apart
+    season_ids = season_players.assign(Player_ID=range(len(season_players)))
+    game_ids = player_games.merge(
+        season_ids[["Team", "Player", "Player_ID"]], on=["Team", "Player"]
+    )
+    expected = LeagueBpmCalculator(season_players, season_teams).calculate_game_stats(
+        player_games, team_games
+    )
+    results = LeagueBpmCalculator(
+        season_ids.replace(renamed), season_teams
+    ).calculate_game_stats(game_ids.replace(renamed), team_games)
+    assert results["BPM"].to_numpy() == pytest.approx(expected["BPM"].to_numpy())
@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+from leagueBpm import LeagueBpmCalculator
+from playerBpm import BpmCalculator, LeagueContext, coefficient_sets
+from resultCache import calculate_cache_key
+from seasonTracker import SeasonTracker
+
+
+def without_baseline(metrics):
+    return {
+        name: value for name, value in metrics.items() if name != "Baseline Pts/TSA"
+    }
+
+
+def test_calculate_league_context(league_data):
+    _, _, season_teams, *_ = league_data
+
+    context = BpmCalculator.calculate_league_context(season_teams)
+    assert context.avg_rating == pytest.approx((115.9 + 86.4) / 2)
+    assert context.baseline_pts_tsa == pytest.approx(
+        2765 / (2110 + 694 * coefficient_sets.get("default").tsa_coef)
+    )
+
+
+def test_calculator_league_context(league_data):
+    teams, _, season_teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+    context = BpmCalculator.calculate_league_context(season_teams)
+
+    class ContextCalculator(BpmCalculator):
+        SEASON_STATS = {"AVG_RATING": context.avg_rating}
+
+    baseline = {"Baseline Pts/TSA": context.baseline_pts_tsa}
+    expected = ContextCalculator(
+        season_df,
+        game_df,
+        {**season_metrics, **baseline},
+        {**game_metrics, **baseline},
+    )
+    calculator = BpmCalculator(
+        season_df,
+        game_df,
+        without_baseline(season_metrics),
+        without_baseline(game_metrics),
+        league_context=context,
+    )
+
+    for aggregation_level in ("game", "season"):
+        assert calculator.calculate_all_stats(
+            general_game, aggregation_level
+        ) == expected.calculate_all_stats(general_game, aggregation_level)
+
+    # The default constants reproduce the context-free results
+    default_context = LeagueContext(avg_rating=103.3, baseline_pts_tsa=1.0)
+    assert BpmCalculator(
+        season_df,
+        game_df,
+        without_baseline(season_metrics),
+        without_baseline(game_metrics),
+        league_context=default_context,
+    ).calculate_all_stats(general_game) == BpmCalculator(
+        season_df, game_df, season_metrics, game_metrics
+    ).calculate_all_stats(
+        general_game
+    )
+
+
+def test_league_context_shared(league_data):
+    teams, season_players, season_teams, player_games, team_games = league_data
+    context = BpmCalculator.calculate_league_context(season_teams)
+
+    class ContextLeague(LeagueBpmCalculator):
+        SEASON_STATS = {"AVG_RATING": context.avg_rating}
+
+    baseline = {"Baseline Pts/TSA": context.baseline_pts_tsa}
+    expected = ContextLeague(season_players, season_teams.assign(**baseline))
+    league = LeagueBpmCalculator(
+        season_players,
+        season_teams.drop(columns="Baseline Pts/TSA"),
+        league_context=context,
+    )
+    assert league.league_context is context
+
+    pd.testing.assert_frame_equal(
+        league.calculate_season_stats(),
+        expected.calculate_season_stats(),
+        check_exact=True,
+    )
+    pd.testing.assert_frame_equal(
+        league.calculate_game_stats(
+            player_games, team_games.drop(columns="Baseline Pts/TSA")
+        ),
+        expected.calculate_game_stats(player_games, team_games.assign(**baseline)),
+        check_exact=True,
+    )
+
+    # Season tracking reads the same context
+    _, game_df, _, game_metrics, general_game = teams["TTU"]
+    default_context = LeagueContext(avg_rating=103.3, baseline_pts_tsa=1.0)
+    results = SeasonTracker(league_context=default_context).add_game(
+        "TTU", game_df, without_baseline(game_metrics), general_game
+    )
+    assert results == SeasonTracker().add_game(
+        "TTU", game_df, game_metrics, general_game
+    )
+
+
+def test_cache_key_league_context(league_data):
+    teams, _, season_teams, *_ = league_data
+    context = BpmCalculator.calculate_league_context(season_teams)
+
+    base = calculate_cache_key(BpmCalculator, *teams["TTU"])
+    assert (
+        calculate_cache_key(BpmCalculator, *teams["TTU"], league_context=context)
+        != base
+    )
@@ -0,0 +1,88 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+from leagueBpm import LeagueBpmCalculator
+from lineups import get_lineup_combinations, score_league_lineups, score_lineups
+
+
+def brute_force_lineups(table, top_k, min_position_spread, max_offensive_role):
+    lineups = []
+    for rows in combinations(range(len(table["Player"])), 5):
+        rows = list(rows)
+        minutes = table["MP"][rows]
+        weights = 5 * minutes / minutes.sum()
+        spread = table["Position"][rows].std()
+        role = table["Offensive_Role"][rows].sum()
+        if spread < min_position_spread or role > max_offensive_role:
+            continue
+        lineups.append(((weights * table["BPM"][rows]).sum(), rows))
+    lineups.sort(key=lambda lineup: -lineup[0])
+    return lineups[:top_k]
+
+
+def test_get_lineup_combinations():
+    lineups = get_lineup_combinations(13)
+    assert lineups.shape == (1287, 5)
+    assert get_lineup_combinations(13) is lineups
+    assert (np.diff(lineups, axis=1) > 0).all()
+
+
+def test_score_league_lineups(league_data):
+    _, season_players, season_teams, *_ = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    options = {"top_k": 4, "min_position_spread": 1.0, "max_offensive_role": 16}
+    results = score_league_lineups(league, **options)
+
+    stats = league.calculate_season_stats(output="columns")
+    for team in ("TTU", "UVA"):
+        rows = np.flatnonzero(stats["Team"] == team)
+        table = {
+            "Player": stats["Player"][rows],
+            "BPM": stats["BPM"][rows],
+            "MP": np.asarray(season_players["MP"], dtype=float)[rows],
+            "Position": league.position[rows],
+            "Offensive_Role": league.offensive_role[rows],
+        }
+        expected = brute_force_lineups(table, **options)
+        team_results = results[results["Team"] == team]
+
+        assert list(team_results["Rank"]) == list(range(1, len(expected) + 1))
+        for (_, lineup), (bpm, expected_rows) in zip(team_results.iterrows(), expected):
+            assert lineup["BPM"] == pytest.approx(bpm)
+            assert {lineup[f"Player_{slot}"] for slot in range(1, 6)} == set(
+                table["Player"][expected_rows]
+            )
+            assert lineup["Position_Spread"] >= 1.0
+            assert lineup["Offensive_Role"] <= 16
+
+
+def test_score_lineups_filters():
+    table = {
+        "Player": np.array(list("ABCDEF")),
+        "MP": np.full(6, 100.0),
+        "Position": np.array([1.0, 2.0, 3.0, 4.0, 5.0, 3.0]),
+        "Offensive_Role": np.array([1.0, 2.0, 3.0, 4.0, 5.0, 3.0]),
+        "BPM": np.array([5.0, 4.0, 3.0, 2.0, 1.0, 0.0]),
+        "OBPM": np.zeros(6),
+        "DBPM": np.zeros(6),
+    }
+
+    results = score_lineups(table, top_k=10, output="columns")
+    assert len(results["Rank"]) == 6
+    assert results["BPM"][0] == pytest.approx(15)
+
+    # Only positions 1-5 (C or F at 3) are spread widely enough
+    results = score_lineups(table, min_position_spread=1.4, output="columns")
+    assert list(results["BPM"]) == [pytest.approx(15), pytest.approx(12)]
+    assert list(results["Player_3"]) == ["C", "D"]
+
+    results = score_lineups(table, max_offensive_role=13, output="columns")
+    assert list(results["BPM"]) == [pytest.approx(14)]
+
+    results = score_lineups(table, min_position_spread=10, output="columns")
+    assert len(results["Rank"]) == 0
+
+    with pytest.raises(ValueError):
+        score_lineups(table, size=7)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from leagueBpm import LeagueBpmCalculator
+from parallelBpm import find_shard_bounds, score_games_parallel
+
+
+def test_find_shard_bounds():
+    team_codes = np.array([0, 0, 0, 1, 1, 2, 3, 3, 3, 3])
+    bounds = find_shard_bounds(team_codes, 3)
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(team_codes)
+    for (_, end), (start, _) in zip(bounds[:-1], bounds[1:]):
+        assert end == start
+        assert team_codes[start - 1] != team_codes[start]
+
+    assert find_shard_bounds(np.zeros(4, int), 8) == [(0, 4)]
+
+
+def test_score_games_parallel(league_data):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    # Interleave the two teams so the runner has to regroup and restore order
+    player_games = player_games.iloc[
+        np.argsort(np.arange(len(player_games)) % 8, kind="stable")
+    ].reset_index(drop=True)
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    expected = league.calculate_game_stats(player_games, team_games)
+    results = score_games_parallel(
+        league, player_games, team_games, processes=2, shards_per_process=1
+    )
+
+    pd.testing.assert_frame_equal(results, expected, check_exact=True)
@@ -0,0 +1,83 @@
+from playerBpm import BpmCalculator, compile_coefficient_set
+from resultCache import ResultCache, calculate_cache_key
+
+
+def test_calculate_all_stats(league_data, tmp_path):
+    teams, *_ = league_data
+    inputs = teams["TTU"]
+
+    cache = ResultCache(path=tmp_path)
+    expected = BpmCalculator(*inputs[:4]).calculate_all_stats(inputs[4])
+
+    assert cache.calculate_all_stats(*inputs) == expected
+    results = cache.calculate_all_stats(*inputs)
+    assert results == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Results are copies of the entry
+    results["Jarrett Culver"]["BPM"] = 0
+    assert cache.calculate_all_stats(*inputs) == expected
+
+    # Entries on disk survive a new cache
+    reloaded = ResultCache(path=tmp_path)
+    assert reloaded.calculate_all_stats(*inputs) == expected
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+
+def test_lru_eviction(league_data):
+    teams, *_ = league_data
+
+    cache = ResultCache(max_entries=1)
+    cache.calculate_all_stats(*teams["TTU"])
+    cache.calculate_all_stats(*teams["UVA"])
+    cache.calculate_all_stats(*teams["TTU"])
+
+    assert cache.misses == 3
+    assert len(cache.entries) == 1
+
+
+def test_cache_key(league_data):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+
+    class RatedCalculator(BpmCalculator):
+        SEASON_STATS = {"AVG_RATING": 105.0}
+
+    coefficient_set = compile_coefficient_set(
+        "pos_1_ast",
+        bpm_coefficients={**BpmCalculator.BPM_COEFFICIENTS, "Pos_1_AST": 1.0},
+        obpm_coefficients=BpmCalculator.OBPM_COEFFICIENTS,
+        bpm_position_constants=BpmCalculator.BPM_POSITION_CONSTANTS,
+        obpm_position_constants=BpmCalculator.OBPM_POSITION_CONSTANTS,
+        position_coefficients=BpmCalculator.POSITION_COEFFICIENTS,
+        offensive_role_coefficients=BpmCalculator.OFFENSIVE_ROLE_COEFFICIENTS,
+    )
+
+    class CoefficientCalculator(BpmCalculator):
+        COEFFICIENT_SET = coefficient_set
+
+    class NetCalculator(BpmCalculator):
+        def calculate_net(self, *args):
+            return 0 * super().calculate_net(*args)
+
+    def key(calculator_class=BpmCalculator, **changes):
+        inputs = {
+            "season_df": season_df,
+            "game_df": game_df,
+            "season_team_metrics": season_metrics,
+            "game_team_metrics": game_metrics,
+            "general_game": general_game,
+            **changes,
+        }
+        return calculate_cache_key(calculator_class, **inputs)
+
+    base = key()
+    assert key() == base
+    assert key(season_df=season_df.assign(Extra=1)) == base
+    assert key(game_df=game_df.assign(AST=game_df["AST"] + 1)) != base
+    assert key(general_game={**general_game, "Team_B_Score": 70}) != base
+    assert key(RatedCalculator) != base
+    assert key(CoefficientCalculator) != base
+    assert key(coefficient_set=coefficient_set) != base
+    assert key(NetCalculator) != base
+    assert key(coefficient_set="default") == base
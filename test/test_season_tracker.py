@@ -0,0 +1,121 @@
+import pytest
+import numpy as np
+from playerBpm import BpmCalculator
+from seasonTracker import SeasonTracker
+
+
+def test_add_game(league_data):
+    teams, *_ = league_data
+    (
+        season_df,
+        game_df,
+        season_team_metrics,
+        game_team_metrics,
+        general_game_stats,
+    ) = teams["TTU"]
+
+    # Season totals before the game: subtract the game from the full season
+    previous_df = season_df.set_index("Player").astype(
+        {column: float for column in BpmCalculator.BOX_SCORE_COLUMNS}
+    )
+    game_totals = game_df.set_index("Player")[list(BpmCalculator.BOX_SCORE_COLUMNS)]
+    previous_df.loc[game_totals.index, game_totals.columns] -= game_totals
+    previous_df = previous_df.reset_index()
+
+    previous_metrics = {
+        **season_team_metrics,
+        "Pace": (66 * 7652 - 71.3128 * 200) / 7452,
+        "Team Pts": 2765 - 75,
+        "Pts": 2765 - 75,
+        "Team FGA": 2110 - 57,
+        "Team FTA": 694 - 19,
+        "Total Minutes": 7452,
+        "Mins": 7452,
+        "Team Games": 37,
+    }
+    for column in ("TRB", "STL", "PF", "AST", "BLK"):
+        previous_metrics[f"Team {column}"] -= game_df[column].sum()
+
+    tracker = SeasonTracker()
+    tracker.add_team("TTU", previous_df, previous_metrics)
+    results = tracker.add_game("TTU", game_df, game_team_metrics, general_game_stats)
+
+    assert tracker.season_team_metrics["TTU"] == pytest.approx(
+        {**season_team_metrics, "Team Games": 38}
+    )
+
+    expected = BpmCalculator(
+        season_df, game_df, season_team_metrics, game_team_metrics
+    ).calculate_all_stats(general_game_stats, aggregation_level="season")
+    assert list(results) == list(expected)
+    for player, stats in expected.items():
+        assert results[player] == pytest.approx(stats)
+
+    context = tracker.season_contexts["TTU"]
+    player_id = context.player_ids["Jarrett Culver"]
+    assert context.position[player_id] == pytest.approx(2.8, 0.01)
+
+
+def test_add_game_new_team(league_data):
+    teams, *_ = league_data
+    _, game_df, _, game_team_metrics, general_game_stats = teams["TTU"]
+
+    tracker = SeasonTracker()
+    tracker.add_game("TTU", game_df, game_team_metrics, general_game_stats)
+    results = tracker.add_game("TTU", game_df, game_team_metrics, general_game_stats)
+
+    metrics = tracker.season_team_metrics["TTU"]
+    assert metrics["Total Minutes"] == 400
+    assert metrics["Team Games"] == 2
+    assert metrics["Pace"] == pytest.approx(71.3128)
+    assert metrics["Team AST"] == 2 * game_df["AST"].sum()
+
+    assert list(results) == list(game_df["Player"])
+    assert np.all(np.isfinite([stats["BPM"] for stats in results.values()]))
+
+
+def test_add_game_keeps_season_baseline(league_data):
+    teams, *_ = league_data
+    season_df, game_df, season_team_metrics, game_team_metrics, general_game = teams[
+        "TTU"
+    ]
+
+    # A game's own baseline doesn't replace the seeded season baseline
+    tracker = SeasonTracker()
+    tracker.add_team("TTU", season_df, season_team_metrics)
+    tracker.add_game(
+        "TTU", game_df, {**game_team_metrics, "Baseline Pts/TSA": 0.8}, general_game
+    )
+    metrics = tracker.season_team_metrics["TTU"]
+    assert metrics["Baseline Pts/TSA"] == season_team_metrics["Baseline Pts/TSA"]
+
+    # New teams take the first game's
+    tracker = SeasonTracker()
+    tracker.add_game("TTU", game_df, game_team_metrics, general_game)
+    tracker.add_game(
+        "TTU", game_df, {**game_team_metrics, "Baseline Pts/TSA": 0.8}, general_game
+    )
+    metrics = tracker.season_team_metrics["TTU"]
+    assert metrics["Baseline Pts/TSA"] == game_team_metrics["Baseline Pts/TSA"]
+
+
+def test_add_game_player_keys(league_data):
+    teams, *_ = league_data
+    _, game_df, _, game_team_metrics, general_game_stats = teams["TTU"]
+
+    # Two teammates sharing a name can't be tracked by name
+    renamed = game_df.replace({"Player": {"Matt Mooney": "Jarrett Culver"}})
+    tracker = SeasonTracker()
+    with pytest.raises(ValueError, match="Jarrett Culver"):
+        tracker.add_game("TTU", renamed, game_team_metrics, general_game_stats)
+
+    # Player_ID takes precedence over names and row order
+    game_ids = renamed.assign(Player_ID=np.arange(len(game_df)) + 100)
+    tracker = SeasonTracker()
+    tracker.add_game("TTU", game_ids, game_team_metrics, general_game_stats)
+    tracker.add_game("TTU", game_ids.iloc[::-1], game_team_metrics, general_game_stats)
+    results = tracker.add_game("TTU", game_ids, game_team_metrics, general_game_stats)
+    season_totals = tracker.season_dfs["TTU"]
+    assert season_totals["Player_ID"] == list(game_ids["Player_ID"])
+    assert season_totals["MP"] == pytest.approx(3 * game_df["MP"].to_numpy())
+    assert list(results) == list(game_ids["Player_ID"])
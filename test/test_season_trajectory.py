@@ -0,0 +1,126 @@
+import pytest
+import pandas as pd
+from playerBpm import BpmKernel
+from seasonTracker import SeasonTracker
+from seasonTrajectory import SeasonTrajectoryCalculator
+
+
+@pytest.fixture
+def game_log(league_data):
+    teams, *_ = league_data
+    _, game_df, _, game_metrics, general_game = teams["TTU"]
+
+    # Three games: a full box score, a short rotation and a sloppier rerun
+    games = [
+        game_df,
+        game_df.iloc[:-3].assign(MP=game_df["MP"][:-3] + 2),
+        game_df.assign(TOV=game_df["TOV"] + 1),
+    ]
+    game_metrics = [
+        game_metrics,
+        {**game_metrics, "Pace": 64.0, "Pts": 70, "FGA": 60},
+        {**game_metrics, "Pace": 69.5},
+    ]
+    general_games = [
+        general_game,
+        {**general_game, "Team_A_Adj_OE": 114.0, "Team_B_Score": 80},
+        {**general_game, "Team_A_Adj_DE": 88.0},
+    ]
+
+    player_games = pd.concat(
+        [games[game].assign(Game=game + 1) for game in range(3)], ignore_index=True
+    )
+    team_games = pd.DataFrame(
+        [
+            {"Game": game + 1, **game_metrics[game], **general_games[game]}
+            for game in range(3)
+        ]
+    )
+    return games, game_metrics, general_games, player_games, team_games
+
+
+def test_calculate_season_to_date(game_log):
+    games, game_metrics, general_games, player_games, team_games = game_log
+
+    results = SeasonTrajectoryCalculator().calculate_season_to_date(
+        player_games, team_games
+    )
+
+    tracker = SeasonTracker()
+    for game, game_df in enumerate(games):
+        expected = tracker.add_game(
+            "TTU", game_df, game_metrics[game], general_games[game]
+        )
+        snapshot = results[results["Game"] == game + 1]
+
+        assert list(snapshot["Player"]) == list(expected)
+        for _, row in snapshot.iterrows():
+            for stat in ("BPM", "OBPM", "DBPM", "CONTRIB"):
+                assert row[stat] == pytest.approx(expected[row["Player"]][stat])
+
+
+def test_calculate_rolling(game_log):
+    _, _, _, player_games, team_games = game_log
+    calculator = SeasonTrajectoryCalculator()
+
+    results = calculator.calculate_rolling(player_games, team_games, windows=(2, 3))
+    season_to_date = calculator.calculate_season_to_date(player_games, team_games)
+
+    # A window as long as the log is the season to date
+    full_window = results[results["Window"] == 3].drop(columns="Window")
+    pd.testing.assert_frame_equal(
+        full_window.reset_index(drop=True), season_to_date, check_exact=False
+    )
+
+    # Two game windows match the season to date of the sliced log
+    two_games = results[results["Window"] == 2]
+    for last_game in (2, 3):
+        games = [last_game - 1, last_game]
+        expected = calculator.calculate_season_to_date(
+            player_games[player_games["Game"].isin(games)],
+            team_games[team_games["Game"].isin(games)],
+        )
+        expected = expected[expected["Game"] == last_game]
+        window = two_games[two_games["Game"] == last_game]
+
+        assert list(window["Player"]) == list(expected["Player"])
+        for stat in ("BPM", "OBPM", "DBPM", "CONTRIB"):
+            assert window[stat].to_numpy() == pytest.approx(expected[stat].to_numpy())
+
+
+def test_calculate_bootstrap(game_log):
+    _, _, _, player_games, team_games = game_log
+    calculator = SeasonTrajectoryCalculator()
+
+    results = calculator.calculate_bootstrap(
+        player_games, team_games, resamples=200, seed=0
+    )
+    season = calculator.calculate_season_to_date(player_games, team_games)
+    season = season[season["Game"] == 3]
+
+    assert list(results["Player"]) == list(season["Player"])
+    for stat in ("BPM", "OBPM", "DBPM"):
+        assert results[stat].to_numpy() == pytest.approx(season[stat].to_numpy())
+        assert (results[f"{stat}_Low"] <= results[f"{stat}_High"]).all()
+    assert (results["Resamples"] <= 200).all()
+
+    # Resamples of identical games all equal the season
+    first_game = player_games[player_games["Game"] == 1]
+    repeated = pd.concat(
+        [first_game.assign(Game=game) for game in (1, 2, 3)], ignore_index=True
+    )
+    repeated_teams = team_games.iloc[[0, 0, 0]].assign(Game=[1, 2, 3])
+
+    results = calculator.calculate_bootstrap(
+        repeated, repeated_teams, resamples=50, seed=1
+    )
+    assert results["BPM_Low"].to_numpy() == pytest.approx(results["BPM"].to_numpy())
+    assert results["BPM_High"].to_numpy() == pytest.approx(results["BPM"].to_numpy())
+
+
+def test_trajectory_shares_kernels_only():
+    trajectory = SeasonTrajectoryCalculator()
+    assert isinstance(trajectory, BpmKernel)
+    # League level APIs read tables a trajectory does not hold
+    for method in ("calculate_season_stats", "calculate_game_stats", "calculate_bpm"):
+        assert not hasattr(trajectory, method)
@@ -0,0 +1,54 @@
+import pytest
+from playerBpm import BpmCalculator
+from leagueBpm import LeagueBpmCalculator
+from stageMetrics import StageMetrics, stage_metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    stage_metrics.reset()
+    stage_metrics.enabled = True
+    yield stage_metrics
+    stage_metrics.enabled = False
+    stage_metrics.reset()
+
+
+def test_stage_metrics(enabled_metrics, league_data):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    league.calculate_game_stats(player_games, team_games)
+    stages = enabled_metrics.snapshot()
+
+    assert stages["position"]["calls"] == 1
+    assert stages["position"]["rows"] == len(season_players)
+    assert stages["offensive_role"]["rows"] == len(season_players)
+    assert stages["p100"]["rows"] == len(player_games)
+    assert stages["team_adjustment"]["calls"] == len(BpmCalculator.BPM_TYPES)
+    assert stages["row_access"]["calls"] == 2
+    assert all(totals["seconds"] >= 0 for totals in stages.values())
+
+
+def test_stage_metrics_disabled(league_data):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, game = teams["TTU"]
+
+    stage_metrics.reset()
+    BpmCalculator(season_df, game_df, season_metrics, game_metrics).calculate_bpm(game)
+
+    assert stage_metrics.snapshot() == {}
+
+
+def test_write_prometheus(tmp_path):
+    metrics = StageMetrics(enabled=True)
+    metrics.record("position", 13, 0.5)
+    metrics.record("position", 12, 0.25)
+
+    path = tmp_path / "bpm.prom"
+    metrics.write_prometheus(path)
+    lines = path.read_text().splitlines()
+
+    assert "# TYPE bpm_stage_seconds_total counter" in lines
+    assert 'bpm_stage_seconds_total{stage="position"} 0.75' in lines
+    assert 'bpm_stage_calls_total{stage="position"} 2' in lines
+    assert 'bpm_stage_rows_total{stage="position"} 25' in lines
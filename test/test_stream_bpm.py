@@ -0,0 +1,83 @@
+import pytest
+import pandas as pd
+from leagueBpm import LeagueBpmCalculator
+from streamBpm import find_group_starts, stream_game_stats
+
+
+def test_find_group_starts():
+    rows = {"Team": ["a", "a", "b", "b", "a"], "Game": [1, 2, 2, 2, 2]}
+    assert list(find_group_starts(rows, ("Team", "Game"))) == [0, 1, 2, 4]
+
+
+def test_stream_game_stats(league_data, tmp_path):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    # Add a second game per team so games span chunk boundaries
+    second_games = player_games.assign(Game=2, PTS=player_games["PTS"] + 2)
+    player_games = pd.concat([player_games, second_games], ignore_index=True)
+    player_games = player_games.sort_values(["Team", "Game"], kind="stable")
+    team_games = pd.concat(
+        [team_games, team_games.assign(Game=2, Team_A_Score=80)], ignore_index=True
+    )
+
+    path = tmp_path / "player_games.csv"
+    player_games.to_csv(path, index=False)
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    expected = league.calculate_game_stats(player_games, team_games)
+
+    streamed = list(stream_game_stats(path, league, team_games, chunksize=5))
+    assert [key for key, _ in streamed] == [
+        ("TTU", 1),
+        ("TTU", 2),
+        ("UVA", 1),
+        ("UVA", 2),
+    ]
+
+    for (team, game), stats in streamed:
+        game_expected = expected[
+            (expected["Team"] == team) & (expected["Game"] == game)
+        ]
+        assert list(stats) == list(game_expected["Player"])
+        for _, row in game_expected.iterrows():
+            for stat in ("BPM", "OBPM", "DBPM", "NET"):
+                assert stats[row["Player"]][stat] == pytest.approx(row[stat])
+
+
+def test_stream_game_stats_not_contiguous(league_data, tmp_path):
+    _, season_players, season_teams, player_games, team_games = league_data
+
+    path = tmp_path / "player_games.csv"
+    player_games.sample(frac=1, random_state=0).to_csv(path, index=False)
+
+    league = LeagueBpmCalculator(season_players, season_teams)
+    with pytest.raises(ValueError):
+        list(stream_game_stats(path, league, team_games, chunksize=4))
+
+
+def test_stream_game_stats_player_keys(league_data, tmp_path):
+    _, season_players, season_teams, player_games, team_games = league_data
+    renamed = {"Player": {"Matt Mooney": "Jarrett Culver"}}
+
+    # Same-named teammates can't be told apart without Player_ID
+    path = tmp_path / "player_games.csv"
+    player_games.replace(renamed).to_csv(path, index=False)
+    league = LeagueBpmCalculator(season_players, season_teams)
+    with pytest.raises(ValueError, match="Jarrett Culver"):
+        list(stream_game_stats(path, league, team_games))
+
+    # With Player_ID every row keeps its own entry
+    season_ids = season_players.assign(Player_ID=range(len(season_players)))
+    game_ids = player_games.merge(
+        season_ids[["Team", "Player", "Player_ID"]], on=["Team", "Player"]
+    )
+    game_ids.replace(renamed).to_csv(path, index=False)
+    league = LeagueBpmCalculator(season_ids.replace(renamed), season_teams)
+    expected = league.calculate_game_stats(game_ids, team_games)
+
+    streamed = dict(stream_game_stats(path, league, team_games))
+    assert sum(len(stats) for stats in streamed.values()) == len(game_ids)
+    for _, row in expected.iterrows():
+        stats = streamed[row["Team"], row["Game"]]
+        player_id = game_ids["Player_ID"][row.name]
+        assert stats[player_id]["BPM"] == pytest.approx(row["BPM"])
@@ -0,0 +1,94 @@
+import pytest
+from playerBpm import BpmCalculator, coefficient_sets
+from whatIf import WhatIfEngine
+
+
+def test_evaluate(league_data):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+
+    calculator = BpmCalculator(season_df, game_df, season_metrics, game_metrics)
+    engine = WhatIfEngine(calculator, general_game)
+    results = engine.evaluate(
+        [
+            {},
+            engine.scale_minutes("Jarrett Culver", 1.2),
+            {"add": {"Matt Mooney": {"TOV": -38}}},
+        ]
+    )
+    assert len(results) == 3 * len(season_df)
+
+    # No change is the base season
+    base = results[results["Scenario"] == 0]
+    expected = calculator.calculate_all_stats(general_game, aggregation_level="season")
+    for _, row in base.iterrows():
+        assert row["BPM"] == pytest.approx(expected[row["Player"]]["BPM"])
+        assert row["BPM_Change"] == pytest.approx(0)
+
+    # Perturbed scenarios match a recomputed season
+    culver = season_df["Player"] == "Jarrett Culver"
+    box_columns = list(BpmCalculator.BOX_SCORE_COLUMNS)
+    more_minutes = season_df.astype({column: float for column in box_columns})
+    scaled_columns = ["MP", "FGA", "FTA", "3P", "AST", "TOV", "ORB", "DRB"]
+    scaled_columns += ["STL", "BLK", "PF", "PTS"]
+    more_minutes.loc[culver, scaled_columns] *= 1.2
+    deltas = (more_minutes[box_columns] - season_df[box_columns])[culver].iloc[0]
+    more_minutes.loc[culver, "TSA"] += (
+        deltas["FGA"] + coefficient_sets.get("default").tsa_coef * deltas["FTA"]
+    )
+    more_minutes.loc[culver, "TRB"] += deltas["ORB"] + deltas["DRB"]
+    deltas = (more_minutes[box_columns] - season_df[box_columns])[culver].iloc[0]
+    fewer_turnovers = season_df.assign(
+        TOV=season_df["TOV"] - 38 * (season_df["Player"] == "Matt Mooney")
+    )
+
+    for scenario, scenario_df, metric_changes in (
+        (
+            1,
+            more_minutes,
+            {
+                metric: deltas[column]
+                for metric, column in WhatIfEngine.TEAM_TOTAL_COLUMNS.items()
+            },
+        ),
+        (2, fewer_turnovers, {}),
+    ):
+        scenario_metrics = {
+            metric: value + metric_changes.get(metric, 0)
+            for metric, value in season_metrics.items()
+        }
+        expected = BpmCalculator(
+            scenario_df, game_df, scenario_metrics, game_metrics
+        ).calculate_all_stats(general_game, aggregation_level="season")
+
+        for _, row in results[results["Scenario"] == scenario].iterrows():
+            for stat in ("BPM", "OBPM", "DBPM", "CONTRIB"):
+                assert row[stat] == pytest.approx(expected[row["Player"]][stat])
+
+
+def test_scenario_players(league_data):
+    teams, *_ = league_data
+    season_df, game_df, season_metrics, game_metrics, general_game = teams["TTU"]
+    renamed = {"Player": {"Matt Mooney": "Jarrett Culver"}}
+
+    # A name two teammates share is ambiguous
+    calculator = BpmCalculator(
+        season_df.replace(renamed), None, season_metrics, game_metrics
+    )
+    engine = WhatIfEngine(calculator, general_game)
+    with pytest.raises(ValueError, match="Jarrett Culver"):
+        engine.evaluate([engine.scale_minutes("Jarrett Culver", 1.2)])
+
+    # Player_ID picks one of them
+    expected = WhatIfEngine(
+        BpmCalculator(season_df, None, season_metrics, game_metrics), general_game
+    ).evaluate([{"add": {"Matt Mooney": {"TOV": -38}}}])
+    season_ids = season_df.assign(Player_ID=range(100, 100 + len(season_df)))
+    player_id = season_ids["Player_ID"][season_df["Player"] == "Matt Mooney"].iloc[0]
+    calculator = BpmCalculator(
+        season_ids.replace(renamed), None, season_metrics, game_metrics
+    )
+    results = WhatIfEngine(calculator, general_game).evaluate(
+        [{"add": {player_id: {"TOV": -38}}}]
+    )
+    assert results["BPM"].to_numpy() == pytest.approx(expected["BPM"].to_numpy())